@@ -8,7 +8,7 @@ which provides portfolio allocation recommendations based on risk profile and go
 import os
 import sys
 import pandas as pd
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 
 # Get the directory of the current script
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,7 +20,7 @@ project_root = os.path.join(current_dir, '..')
 sys.path.append(project_root)
 
 # Import the LLM utility and prompts
-from utils.llm_response import generate_text, DekaLLMClient
+from utils.llm_response import generate_text, stream_text, DekaLLMClient
 from prompts.asset_allocation_agent_prompts import AssetAllocationPrompts
 
 class AssetAllocationAgent:
@@ -424,6 +424,54 @@ class AssetAllocationAgent:
         Returns:
             Explanation of the allocation strategy
         """
+        # Generate the explanation
+        system_prompt = AssetAllocationPrompts.SYSTEM_PROMPT
+        explanation = generate_text(
+            prompt=self._build_strategy_explanation_prompt(risk_profile, goal_timeline, goal_type),
+            system_prompt=system_prompt,
+            temperature=1e-8,
+            max_tokens=800
+        )
+        
+        return explanation
+    
+    def stream_allocation_strategy(self,
+                                   risk_profile: str,
+                                   goal_timeline: str,
+                                   goal_type: str = None) -> Iterator[str]:
+        """
+        Stream the explanation of a recommended allocation as it is generated.
+        
+        Args:
+            risk_profile: User's risk profile
+            goal_timeline: Timeline of the goal
+            goal_type: Type of financial goal (optional)
+            
+        Yields:
+            Chunks of the explanation, in order
+        """
+        yield from stream_text(
+            prompt=self._build_strategy_explanation_prompt(risk_profile, goal_timeline, goal_type),
+            system_prompt=AssetAllocationPrompts.SYSTEM_PROMPT,
+            temperature=1e-8,
+            max_tokens=800
+        )
+    
+    def _build_strategy_explanation_prompt(self,
+                                           risk_profile: str,
+                                           goal_timeline: str,
+                                           goal_type: str = None) -> str:
+        """
+        Create the prompt explaining the strategy behind a recommended allocation.
+        
+        Args:
+            risk_profile: User's risk profile
+            goal_timeline: Timeline of the goal
+            goal_type: Type of financial goal (optional)
+            
+        Returns:
+            Formatted prompt for LLM
+        """
         # Get the recommended allocation
         allocation = self.get_allocation_recommendation(
             risk_profile=risk_profile,
@@ -435,23 +483,12 @@ class AssetAllocationAgent:
         allocation_text = "\n".join([f"- {asset}: {pct}%" for asset, pct in allocation.items()])
         
         # Create prompt for LLM
-        prompt = AssetAllocationPrompts.STRATEGY_EXPLANATION_PROMPT.format(
+        return AssetAllocationPrompts.STRATEGY_EXPLANATION_PROMPT.format(
             risk_profile=risk_profile,
             goal_timeline=goal_timeline,
             goal_type=goal_type if goal_type else "general investing",
             allocation=allocation_text
         )
-        
-        # Generate the explanation
-        system_prompt = AssetAllocationPrompts.SYSTEM_PROMPT
-        explanation = generate_text(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            temperature=1e-8,
-            max_tokens=800
-        )
-        
-        return explanation
 
 
 def main():
@@ -96,12 +96,14 @@ class EducationAgent:
             max_length=max_length
         )
         
-        # Generate educational content using LLM
+        # Generate educational content using LLM. Nearby topics ("Roth IRA" /
+        # "Traditional IRA") embed too closely for similarity matching, so only
+        # exact repeats of the request are reused, via the temperature 0 cache
         system_prompt = EducationPrompts.SYSTEM_PROMPT
         response = generate_text(
             prompt=prompt,
             system_prompt=system_prompt,
-            temperature=1e-8,
+            temperature=0,
             max_tokens=1500
         )
         
@@ -162,10 +164,11 @@ class EducationAgent:
         prompt = EducationPrompts.INVESTMENT_TERM_PROMPT.format(term=term)
         system_prompt = EducationPrompts.SYSTEM_PROMPT
         
+        # Only exact repeats of a term are reused, via the temperature 0 cache
         response = generate_text(
             prompt=prompt,
             system_prompt=system_prompt,
-            temperature=1e-8,
+            temperature=0,
             max_tokens=500
         )
         
@@ -12,7 +12,8 @@ and rewrite context-dependent queries.
 import os
 import sys
 import pandas as pd
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import traceback
 import re
 
@@ -936,121 +937,163 @@ Would you like specific advice on how to rebalance your portfolio to better alig
             classification.insert(0, "Goal Planning")
             print("Added Goal Planning to classification due to goal focus detection")
         
-        # Get responses from each applicable agent
-        for category in classification:
-            if category == "Goal Planning":
-                # Get response from Goal Planning Agent for goal-focused queries
-                try:
-                    print(f"Processing goal planning request: '{user_query}'")
-                    goal_response = self.goal_planning_agent.handle_goal_request(
-                        request=user_query,
-                        user_context=user_context
-                    )
+        # Goal Planning runs first, since goal-focused queries can return early
+        if "Goal Planning" in classification:
+            # Get response from Goal Planning Agent for goal-focused queries
+            try:
+                print(f"Processing goal planning request: '{user_query}'")
+                goal_response = self.goal_planning_agent.handle_goal_request(
+                    request=user_query,
+                    user_context=user_context
+                )
+                
+                # Format the response based on type
+                if isinstance(goal_response, dict) and goal_response.get("success", False):
+                    response_type = goal_response.get("response_type", "")
                     
-                    # Format the response based on type
-                    if isinstance(goal_response, dict) and goal_response.get("success", False):
-                        response_type = goal_response.get("response_type", "")
-                        
-                        if response_type == "goal_created":
-                            agent_responses["Goal Planning"] = (
-                                f"Goal created successfully!\n\n"
-                                f"Goal ID: {goal_response['goal_id']}\n"
-                                f"Type: {goal_response['goal_data']['goal_type']}\n"
-                                f"Target Amount: ${goal_response['goal_data']['target_amount']:,.2f}\n"
-                                f"Monthly Contribution: ${goal_response['goal_data']['monthly_contribution']:,.2f}\n"
-                                f"Timeline: {goal_response['goal_data']['goal_timeline']}\n\n"
-                                f"{goal_response['strategy_explanation']}"
-                            )
-                        elif response_type == "all_goals":
-                            goals_list = goal_response.get("goals", [])
-                            if goals_list:
-                                goals_text = "\n".join([
-                                    f"- {goal['Goal Type']}: ${goal['Target Amount']:,.2f} "
-                                    f"({goal['Progress (%)']:.1f}% complete, target: {goal['Target Date']})"
-                                    for goal in goals_list
-                                ])
-                                agent_responses["Goal Planning"] = f"Current financial goals:\n{goals_text}"
-                            else:
-                                agent_responses["Goal Planning"] = "No financial goals found."
-                        elif response_type == "goal_recommendations":
-                            agent_responses["Goal Planning"] = goal_response.get("recommendations", "")
+                    if response_type == "goal_created":
+                        agent_responses["Goal Planning"] = (
+                            f"Goal created successfully!\n\n"
+                            f"Goal ID: {goal_response['goal_id']}\n"
+                            f"Type: {goal_response['goal_data']['goal_type']}\n"
+                            f"Target Amount: ${goal_response['goal_data']['target_amount']:,.2f}\n"
+                            f"Monthly Contribution: ${goal_response['goal_data']['monthly_contribution']:,.2f}\n"
+                            f"Timeline: {goal_response['goal_data']['goal_timeline']}\n\n"
+                            f"{goal_response['strategy_explanation']}"
+                        )
+                    elif response_type == "all_goals":
+                        goals_list = goal_response.get("goals", [])
+                        if goals_list:
+                            goals_text = "\n".join([
+                                f"- {goal['Goal Type']}: ${goal['Target Amount']:,.2f} "
+                                f"({goal['Progress (%)']:.1f}% complete, target: {goal['Target Date']})"
+                                for goal in goals_list
+                            ])
+                            agent_responses["Goal Planning"] = f"Current financial goals:\n{goals_text}"
                         else:
-                            # For other response types, use the content if available
-                            agent_responses["Goal Planning"] = goal_response.get("content", str(goal_response))
+                            agent_responses["Goal Planning"] = "No financial goals found."
+                    elif response_type == "goal_recommendations":
+                        agent_responses["Goal Planning"] = goal_response.get("recommendations", "")
                     else:
-                        agent_responses["Goal Planning"] = str(goal_response)
-                    
-                    # For goal-focused queries with successful responses, we can return early
-                    if is_goal_focused and agent_responses["Goal Planning"]:
-                        return agent_responses
-                        
-                except Exception as e:
-                    print(f"Error processing goal planning request: {str(e)}")
-                    agent_responses["Goal Planning"] = "I encountered an issue processing your goal-related request."
-                    
-            elif category == "Transaction Analysis":
-                # Only generate nudges if this isn't explicitly a goal-focused query
-                if not is_goal_focused:
-                    # Get response from Transaction Analysis Agent
-                    try:
-                        print(f"Generating nudges for customer {customer_id}")
-                        nudges = self.transaction_agent.generate_nudges(customer_id)
-                        agent_responses["Transaction Analysis"] = nudges
-                    except Exception as e:
-                        print(f"Error generating nudges: {str(e)}")
-                        agent_responses["Transaction Analysis"] = "Unable to generate transaction insights at this time."
+                        # For other response types, use the content if available
+                        agent_responses["Goal Planning"] = goal_response.get("content", str(goal_response))
                 else:
-                    print(f"Skipping nudge generation for goal-focused query: '{user_query}'")
-                    
-            elif category == "Asset Allocation":
-                try:
-                    # Use the asset allocation query handler
-                    print(f"Processing asset allocation query: '{user_query}'")
-                    allocation_response = self.asset_allocation_agent.handle_query(
-                        user_query=user_query,
-                        customer_id=customer_id,
-                        user_context=user_context
-                    )
-                    
-                    agent_responses["Asset Allocation"] = allocation_response
-                except Exception as e:
-                    print(f"Error processing asset allocation query: {str(e)}")
-                    print(traceback.format_exc())
-                    agent_responses["Asset Allocation"] = "I'm unable to provide allocation advice at this time due to a technical issue."
-                    
-            elif category == "Education":
-                try:
-                    # Extract educational topic
-                    topic = self._extract_education_topic(user_query)
-                    print(f"Extracting educational content for topic: {topic}")
-                    
-                    # Get educational content
-                    educational_content = self.education_agent.get_educational_content(
-                        topic=topic,
-                        user_context=user_context
-                    )
-                    
-                    agent_responses["Education"] = educational_content
-                except Exception as e:
-                    print(f"Error generating educational content: {str(e)}")
-                    agent_responses["Education"] = f"I'd be happy to explain about {topic}, but I'm having trouble accessing that information right now."
-                    
-            elif category == "General Financial Advice":
-                try:
-                    # Generate general financial advice
-                    print("Generating general financial advice")
-                    general_advice = self._generate_general_advice(
-                        user_query=user_query,
-                        user_context=user_context
-                    )
+                    agent_responses["Goal Planning"] = str(goal_response)
+                
+                # For goal-focused queries with successful responses, we can return early
+                if is_goal_focused and agent_responses["Goal Planning"]:
+                    return agent_responses
                     
-                    agent_responses["General Financial Advice"] = general_advice
-                except Exception as e:
-                    print(f"Error generating general advice: {str(e)}")
-                    agent_responses["General Financial Advice"] = "I'd be happy to provide financial advice, but I'm having trouble generating personalized recommendations at the moment."
+            except Exception as e:
+                print(f"Error processing goal planning request: {str(e)}")
+                agent_responses["Goal Planning"] = "I encountered an issue processing your goal-related request."
+                
+        # The remaining agents are independent LLM-bound calls, so fan them out
+        other_categories = [category for category in classification if category != "Goal Planning"]
+        if other_categories:
+            with ThreadPoolExecutor(max_workers=len(other_categories)) as executor:
+                futures = {
+                    executor.submit(
+                        self._get_specialized_agent_response,
+                        category,
+                        user_query,
+                        customer_id,
+                        user_context,
+                        is_goal_focused
+                    ): category
+                    for category in other_categories
+                }
+                results = {futures[future]: future.result() for future in as_completed(futures)}
+            
+            # Keep responses in classification order
+            for category in other_categories:
+                if results[category] is not None:
+                    agent_responses[category] = results[category]
         
         return agent_responses
     
+    def _get_specialized_agent_response(self,
+                                        category: str,
+                                        user_query: str,
+                                        customer_id: str,
+                                        user_context: Dict[str, Any],
+                                        is_goal_focused: bool = False) -> Optional[str]:
+        """
+        Get the response of a single specialized agent other than Goal Planning.
+        
+        Args:
+            category: Agent category to query
+            user_query: User's question or request
+            customer_id: ID of the customer
+            user_context: Context information about the user
+            is_goal_focused: Flag indicating if this is explicitly a goal-related query
+            
+        Returns:
+            The agent's response, or None if the agent was skipped
+        """
+        if category == "Transaction Analysis":
+            # Only generate nudges if this isn't explicitly a goal-focused query
+            if not is_goal_focused:
+                # Get response from Transaction Analysis Agent
+                try:
+                    print(f"Generating nudges for customer {customer_id}")
+                    nudges = self.transaction_agent.generate_nudges(customer_id)
+                    return nudges
+                except Exception as e:
+                    print(f"Error generating nudges: {str(e)}")
+                    return "Unable to generate transaction insights at this time."
+            else:
+                print(f"Skipping nudge generation for goal-focused query: '{user_query}'")
+                
+        elif category == "Asset Allocation":
+            try:
+                # Use the asset allocation query handler
+                print(f"Processing asset allocation query: '{user_query}'")
+                allocation_response = self.asset_allocation_agent.handle_query(
+                    user_query=user_query,
+                    customer_id=customer_id,
+                    user_context=user_context
+                )
+                
+                return allocation_response
+            except Exception as e:
+                print(f"Error processing asset allocation query: {str(e)}")
+                print(traceback.format_exc())
+                return "I'm unable to provide allocation advice at this time due to a technical issue."
+                
+        elif category == "Education":
+            try:
+                # Extract educational topic
+                topic = self._extract_education_topic(user_query)
+                print(f"Extracting educational content for topic: {topic}")
+                
+                # Get educational content
+                educational_content = self.education_agent.get_educational_content(
+                    topic=topic,
+                    user_context=user_context
+                )
+                
+                return educational_content
+            except Exception as e:
+                print(f"Error generating educational content: {str(e)}")
+                return f"I'd be happy to explain about {topic}, but I'm having trouble accessing that information right now."
+                
+        elif category == "General Financial Advice":
+            try:
+                # Generate general financial advice
+                print("Generating general financial advice")
+                general_advice = self._generate_general_advice(
+                    user_query=user_query,
+                    user_context=user_context
+                )
+                
+                return general_advice
+            except Exception as e:
+                print(f"Error generating general advice: {str(e)}")
+                return "I'd be happy to provide financial advice, but I'm having trouble generating personalized recommendations at the moment."
+    
+        return None
+    
     def _extract_education_topic(self, query: str) -> str:
         """Extract the educational topic from a query."""
         # Look for patterns like "explain X", "what is X", "tell me about X"
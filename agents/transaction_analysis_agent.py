@@ -7,6 +7,7 @@ which analyzes customer transaction data and generates relevant financial nudges
 
 import os
 import sys
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Any
 from dotenv import load_dotenv
@@ -22,11 +23,29 @@ sys.path.append(project_root)
 
 # Import the LLM utility and prompts
 from utils.llm_response import generate_text, DekaLLMClient
-from prompts.transaction_agent_prompts import TransactionAnalysisPrompts
+from utils.response_cache import ResponseCache
+from prompts.transaction_agent_prompts import TransactionAnalysisPrompts, preload as preload_prompts
 
 # Load environment variables
 load_dotenv()
 
+# Minimum number of transactions for IQR-based unusual activity detection
+MIN_IQR_TRANSACTIONS = 8
+
+# Prompt assets rendered by generate_nudges; their fingerprints are part of the
+# nudge cache key, so editing any of them invalidates the cached nudges
+NUDGE_PROMPTS = (
+    "FORMATTING_RULES",
+    "SYSTEM_PROMPT",
+    "TRANSACTION_ANALYSIS_PROMPT",
+    "BUDGET_ALERT_PROMPT",
+    "SUBSCRIPTION_ANALYSIS_PROMPT",
+    "GOAL_ALIGNMENT_PROMPT",
+    "RECURRING_CHARGE_PROMPT",
+    "GOAL_MILESTONE_PROMPT",
+    "RESPONSE_FORMATTING_PROMPT",
+)
+
 class TransactionAnalysisAgent:
     """
     Analyzes customer financial data and generates personalized nudges.
@@ -46,9 +65,15 @@ class TransactionAnalysisAgent:
         self.llm_client = DekaLLMClient()
         self.nudge_definitions = self._load_nudge_definitions()
         
+        # Cache generated nudges so unchanged customer data skips the LLM
+        self.response_cache = ResponseCache(os.path.join(data_path, "nudge_cache.sqlite3"))
+        
         # Load all data files
         self._load_data_files()
         
+        # Read and compile the prompt templates now rather than on the first request
+        preload_prompts()
+        
         print("Transaction Analysis Agent initialized successfully.")
     
     def _load_data_files(self):
@@ -301,7 +326,7 @@ class TransactionAnalysisAgent:
         # In a real system, this would be more sophisticated with statistical analysis
         # For now, consider transactions over $300 as unusual
         if not customer_txns.empty:
-            return any(customer_txns['Transaction Amount'] > 300)
+            return bool((customer_txns['Transaction Amount'].to_numpy() > 300).any())
         return False
     
     def _check_overdraft_fee(self, customer_id: str) -> bool:
@@ -351,23 +376,29 @@ class TransactionAnalysisAgent:
         
         return formatted_data
     
-    def check_unusual_activity(self, customer_id: str) -> bool:
+    def check_unusual_activity(self, customer_id: str) -> pd.DataFrame:
         """Check for unusual activity based on transaction amount using IQR method."""
         customer_txns = self.transactions_df[self.transactions_df['Customer ID'] == customer_id]
+        amounts = customer_txns['Transaction Amount'].to_numpy()
+        
+        # Too few or identical amounts give no meaningful quartiles to compare against
+        if amounts.size < MIN_IQR_TRANSACTIONS or np.ptp(amounts) == 0:
+            return customer_txns.iloc[0:0]
                 
-        # Calculate IQR for transaction amounts
-        amounts = customer_txns['Transaction Amount']
-        q1 = amounts.quantile(0.25)
-        q3 = amounts.quantile(0.75)
+        # Calculate IQR for transaction amounts (both quartiles from a single sort)
+        q1, q3 = np.quantile(amounts, [0.25, 0.75])
         iqr = q3 - q1
         
         # Define upper bound for outliers (Q3 + 1.5*IQR)
         upper_bound = q3 + 1.5 * iqr
         
-        # Find transactions that exceed the upper bound
-        unusual_txns = customer_txns[amounts > upper_bound]
+        # Find transactions that exceed the upper bound, only masking the frame when there are any
+        is_unusual = amounts > upper_bound
+        if not is_unusual.any():
+            return customer_txns.iloc[0:0]
+        unusual_txns = customer_txns[is_unusual]
         
-        # Return True if any unusual transactions are found
+        # Return the unusual transactions themselves so they can be quoted in the prompt
         return unusual_txns
         
     def check_high_category_spending(self, customer_id: str) -> str:
@@ -468,27 +499,24 @@ class TransactionAnalysisAgent:
         # Format customer data for prompts
         formatted_data = self._format_data_for_prompt(customer_id)
         
+        # Reuse the previous result if neither the customer's data nor the prompts have changed
+        cache_key = ResponseCache.make_key(
+            "generate_nudges",
+            prompt_hash=b"".join(getattr(TransactionAnalysisPrompts, name + "_HASH") for name in NUDGE_PROMPTS),
+            customer_id=customer_id,
+            applicable_nudges=applicable_nudges,
+            data=formatted_data
+        )
+        cached_response = self.response_cache.get(cache_key)
+        if cached_response is not None:
+            print(f"Using cached nudges for customer {customer_id}")
+            return cached_response
+        
         # Create a specialized prompt based on applicable nudges
         nudge_prompt = self._create_specialized_nudge_prompt(customer_id, applicable_nudges, formatted_data)
         
-        # Add explicit formatting guidelines to the prompt
-        nudge_prompt += "\n\n" + TransactionAnalysisPrompts.TRANSACTION_FORMATTING_GUIDE
-        nudge_prompt += "\n\nThese formatting requirements are CRITICAL and must be applied consistently throughout your response."
-        
-        # Enhanced system prompt with explicit formatting requirements
-        system_prompt = TransactionAnalysisPrompts.SYSTEM_PROMPT + """
-
-CRITICAL FORMATTING REQUIREMENTS:
-1. ALWAYS format monetary values as "$ 123.45" with a space after the dollar sign
-2. ALWAYS add spaces between words - never allow words to run together
-3. ALWAYS format transaction IDs with a space after them: "TX12345 "
-4. NEVER allow character-by-character spacing in the output (like "1 0 0")
-5. ALWAYS use proper spacing in descriptive phrases (like "per month" not "permonth")
-6. ALWAYS format parenthetical amounts as " ($ 123.45) " with spaces inside and outside
-7. ALWAYS format numbers with proper digit grouping (e.g., "$ 1,200" not "$ 1200")
-
-These formatting standards are non-negotiable and must be followed perfectly.
-"""
+        # System prompt led by the shared formatting rules
+        system_prompt = self._build_system_prompt()
         
         # Call the LLM to generate nudges
         nudge_response = generate_text(
@@ -499,20 +527,7 @@ These formatting standards are non-negotiable and must be followed perfectly.
         )
         
         # Format the final response with explicit formatting instructions
-        formatting_prompt = TransactionAnalysisPrompts.RESPONSE_FORMATTING_PROMPT + """
-
-REMINDER - These formatting requirements are ABSOLUTELY CRITICAL:
-1. EVERY monetary amount must be formatted as "$ 123.45" (with a space after the $ sign)
-2. EVERY transaction ID must have a space after it: "TX12345 " not "TX12345"
-3. ALL words must have proper spacing between them - NO words should run together
-4. ALL parenthetical amounts must be formatted as " ($ 123.45) " (with spaces inside and outside)
-5. EVERY descriptive phrase must have proper spaces: "per month" not "permonth"
-6. NEVER output text with character-by-character spacing (like "1 0 0" or "p e r")
-7. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-
-The quality of your response will be primarily judged on whether you follow these formatting rules perfectly.
-Make sure to ONLY OUTPUT THE DOCUMENT
-"""
+        formatting_prompt = TransactionAnalysisPrompts.RESPONSE_FORMATTING_PROMPT + "\n\nMake sure to ONLY OUTPUT THE DOCUMENT"
         
         final_response = generate_text(
             prompt=f"{formatting_prompt}\n\nNudges to format (ONLY for these applicable types: {', '.join(applicable_nudges)}):\n{nudge_response}",
@@ -521,19 +536,11 @@ Make sure to ONLY OUTPUT THE DOCUMENT
             max_tokens=2000
         )
         
-        # One quick check to verify the formatting is correct
+        # One quick check against the shared formatting rules
         verification_prompt = """
-        This is a verification pass to make sure the document follows the critical formatting requirements.
+        This is a verification pass to make sure the document follows the formatting requirements above.
         
-        Check EVERY INSTANCE of these elements and fix ANY that don't conform:
-        
-        1. ALL monetary amounts: Must be "$ 123.45" with a space after the dollar sign
-        2. ALL transaction IDs: Must have a space after them, like "TX12345 "
-        3. ALL words: Must have proper spacing - no run-together words
-        4. ALL parenthetical amounts: Must be " ($ 123.45) " with spaces
-        5. ALL numeric values in text: Must have proper spacing "$ 100 per month"
-        
-        If you see ANY formatting issues at all, fix them.
+        Check EVERY monetary amount, transaction ID and descriptive phrase, and fix ANY that don't conform.
         
         Document to verify:
         
@@ -545,13 +552,30 @@ Make sure to ONLY OUTPUT THE DOCUMENT
         # Run a verification to catch any remaining issues
         final_response = generate_text(
             prompt=verification_prompt.format(response=final_response),
-            system_prompt="You are a financial document formatting expert. Your only job is to ensure the document follows the required formatting rules EXACTLY as specified.",
+            system_prompt=(
+                TransactionAnalysisPrompts.FORMATTING_RULES
+                + "\n\nYou are a financial document formatting expert. Your only job is to ensure the document follows the required formatting rules EXACTLY as specified."
+            ),
             temperature=1e-8,
             max_tokens=2000
         )
         
+        self.response_cache.set(cache_key, final_response)
+        
         return final_response
-    
+
+    def _build_system_prompt(self) -> str:
+        """
+        Build the system message for nudge generation.
+
+        The shared formatting rules are placed first so every call starts with
+        the same prefix.
+
+        Returns:
+            System prompt text
+        """
+        return TransactionAnalysisPrompts.FORMATTING_RULES + "\n\n" + TransactionAnalysisPrompts.SYSTEM_PROMPT
+
     def _create_specialized_nudge_prompt(
         self, 
         customer_id: str, 
@@ -570,7 +594,7 @@ Make sure to ONLY OUTPUT THE DOCUMENT
             Specialized prompt text
         """
         # Start with basic analysis prompt
-        base_prompt = TransactionAnalysisPrompts.TRANSACTION_ANALYSIS_PROMPT.format(
+        base_prompt = TransactionAnalysisPrompts.TRANSACTION_ANALYSIS_PROMPT_RENDER(
             customer_id=customer_id,
             transaction_data=formatted_data["transaction_data"],
             user_profile=formatted_data["user_profile"],
@@ -588,27 +612,20 @@ Make sure to ONLY OUTPUT THE DOCUMENT
             f"Focus ONLY on generating the following types of nudges that are relevant to this customer: {', '.join(applicable_nudges)}."
         ]
         
-        # Add important formatting reminder
-        specialized_sections.append("""
-        REMEMBER: All monetary values MUST be formatted as "$ 123.45" with a space after the dollar sign.
-        All transaction IDs MUST have a space after them (e.g., "TX12345 ").
-        All words in descriptive phrases MUST have proper spacing (e.g., "per month" not "permonth").
-        All parenthetical amounts MUST be formatted as " ($ 123.45) " with spaces inside and outside.
-        NEVER allow words to run together without spaces.
-        NEVER allow character-by-character spacing in the output.
-        """)
+        # Transactions flagged by the IQR check, quoted in the unusual activity prompt
+        unusual_txns = self.check_unusual_activity(customer_id)
         
         # Create a mapping of nudge types to their specialized prompts
         nudge_prompt_mapping = {
-            "budget_threshold": TransactionAnalysisPrompts.BUDGET_ALERT_PROMPT.format(
+            "budget_threshold": TransactionAnalysisPrompts.BUDGET_ALERT_PROMPT_RENDER(
                 customer_id=customer_id,
                 budget_data=formatted_data["budget_data"]
             ),
-            "recurring_subscriptions": TransactionAnalysisPrompts.SUBSCRIPTION_ANALYSIS_PROMPT.format(
+            "recurring_subscriptions": TransactionAnalysisPrompts.SUBSCRIPTION_ANALYSIS_PROMPT_RENDER(
                 customer_id=customer_id,
                 subscription_data=formatted_data["subscription_data"]
             ),
-            "goal_progress": TransactionAnalysisPrompts.GOAL_ALIGNMENT_PROMPT.format(
+            "goal_progress": TransactionAnalysisPrompts.GOAL_ALIGNMENT_PROMPT_RENDER(
                 customer_id=customer_id,
                 financial_goals=formatted_data["financial_goals"],
                 transaction_data=formatted_data["transaction_data"]
@@ -708,13 +725,13 @@ Make sure to ONLY OUTPUT THE DOCUMENT
                 4. Suggests budget adjustments if needed
                 5. Offers recommendations for managing bill payments more effectively
             """,
-            "recurring_charge_change": TransactionAnalysisPrompts.RECURRING_CHARGE_PROMPT.format(
+            "recurring_charge_change": TransactionAnalysisPrompts.RECURRING_CHARGE_PROMPT_RENDER(
                 customer_id=customer_id,
                 subscription_data=formatted_data["subscription_data"],
                 transaction_data=formatted_data["transaction_data"]
             ),
             "unusual_activity": f"""
-                {self.check_unusual_activity}
+                {unusual_txns.to_string(index=False) if not unusual_txns.empty else "No unusual transactions found."}
                 These are the unusual activity transaction. Explain about the transaction and why it is considered unusual.
                 
                 User Profile:
@@ -741,7 +758,7 @@ Make sure to ONLY OUTPUT THE DOCUMENT
                 4. Provides specific strategies to avoid future overdrafts
                 5. If applicable, suggests account types or settings that could prevent overdrafts
             """,
-            "goal_milestone": TransactionAnalysisPrompts.GOAL_MILESTONE_PROMPT.format(
+            "goal_milestone": TransactionAnalysisPrompts.GOAL_MILESTONE_PROMPT_RENDER(
                 customer_id=customer_id,
                 financial_goals=formatted_data["financial_goals"]
             )
@@ -759,20 +776,8 @@ Make sure to ONLY OUTPUT THE DOCUMENT
                 f"Do NOT generate nudges for the following types, as they are not applicable to this customer at this time: {', '.join(non_applicable)}."
             )
         
-        # Add final reminder about formatting requirements
-        specialized_sections.append("""
-        FINAL CRITICAL REMINDER: 
-        - ALL monetary values MUST be formatted as "$ 123.45" with a space after the dollar sign
-        - ALL transaction IDs MUST have a space after them like "TX12345 "
-        - NEVER allow character-by-character spacing in your output
-        - NEVER allow words to run together like "permonth" instead of "per month"
-        - ALWAYS format ranges with proper spacing: "$ 200 - $ 500" not "$200-$500"
-        - ALWAYS format parenthetical amounts as " ($ 123.45) " with spaces inside and outside
-        
-        The quality of your response will be primarily judged by whether you format ALL text elements correctly.
-        
-        ONLY OUTPUT THE NUDGES
-        """)
+        # The formatting rules are in the system prompt; only restrict the output here
+        specialized_sections.append("ONLY OUTPUT THE NUDGES")
         
         # Combine all prompt sections
         full_prompt = base_prompt + "\n\n" + "\n\n".join(specialized_sections)
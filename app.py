@@ -48,7 +48,7 @@ def load_user_data():
 
 @st.cache_data
 def load_goals_data():
-    goals_df = pd.read_csv(f"{DATA_PATH}/enhanced_goal_data.csv")
+    goals_df = get_goal_manager().get_all_goals()
     return goals_df
 
 @st.cache_data
@@ -412,7 +412,7 @@ def goal_planning_page():
     display_user_info(selected_user)
     
     # Initialize financial advisor and goal manager
-    goal_manager = GoalDataManager(data_path=DATA_PATH)
+    goal_manager = get_goal_manager()
     
     # Create tabs for different goal planning activities
     tab1, tab2, tab3 = st.tabs(["View Goals", "Create Goal", "Get Recommendations"])
@@ -420,24 +420,16 @@ def goal_planning_page():
     with tab1:
         st.subheader("Your Financial Goals")
         
-        # Force direct read from file
-        goals_file = os.path.join(DATA_PATH, "enhanced_goal_data.csv")
-        
         try:
-            # Read the file directly
-            if os.path.exists(goals_file):
-                user_goals = pd.read_csv(goals_file)
-                # Filter for the selected user - try both cases
-                user_goals_lower = user_goals[user_goals['Customer ID'] == selected_user.lower()]
-                user_goals_upper = user_goals[user_goals['Customer ID'] == selected_user.upper()]
-                user_goals = pd.concat([user_goals_lower, user_goals_upper])
-                
-                st.sidebar.success(f"Loaded {len(user_goals)} goals from file")
-            else:
-                st.error(f"Goals file not found: {goals_file}")
-                user_goals = pd.DataFrame()
+            # The goal manager picks up changes made through chat on every read
+            # Filter for the selected user - try both cases
+            user_goals_lower = goal_manager.get_user_goals(selected_user.lower())
+            user_goals_upper = goal_manager.get_user_goals(selected_user.upper())
+            user_goals = pd.concat([user_goals_lower, user_goals_upper])
+            
+            st.sidebar.success(f"Loaded {len(user_goals)} goals from the goal database")
         except Exception as e:
-            st.error(f"Error reading goals file: {str(e)}")
+            st.error(f"Error reading goals from the goal database: {str(e)}")
             user_goals = pd.DataFrame()
         
         if user_goals.empty:
@@ -483,16 +475,13 @@ def goal_planning_page():
                         
                         # Add delete button
                         if st.button(f"🗑️ Delete Goal", key=f"delete_{goal_id}"):
-                            # Directly modify the CSV file
                             try:
-                                df = pd.read_csv(goals_file)
-                                # Filter out the goal
-                                df = df[df['Goal ID'] != goal_id]
-                                # Write back to file
-                                df.to_csv(goals_file, index=False)
-                                st.success(f"Goal '{goal['Goal Name']}' deleted successfully!")
-                                # Force page reload
-                                st.rerun()
+                                if goal_manager.delete_goal(goal_id):
+                                    st.success(f"Goal '{goal['Goal Name']}' deleted successfully!")
+                                    # Force page reload
+                                    st.rerun()
+                                else:
+                                    st.error(f"Failed to delete goal {goal_id}.")
                             except Exception as e:
                                 st.error(f"Failed to delete goal: {str(e)}")
                     
@@ -552,64 +541,26 @@ def goal_planning_page():
                     submit_button = st.form_submit_button("Save Changes")
                     
                     if submit_button:
-                        # Direct modification of the CSV file
                         try:
-                            df = pd.read_csv(goals_file)
-                            
-                            # Find the row with the goal ID
-                            mask = df['Goal ID'] == goal_id
+                            # Progress and goal timeline are recalculated by the goal manager
+                            updated = goal_manager.update_goal(
+                                goal_id,
+                                goal_name=goal_name,
+                                goal_type=goal_type,
+                                target_amount=target_amount,
+                                current_savings=current_savings,
+                                target_date=new_target_date.strftime("%m/%d/%Y"),
+                                priority=priority
+                            )
                             
-                            if any(mask):
-                                # Update fields
-                                df.loc[mask, 'Goal Name'] = goal_name
-                                df.loc[mask, 'Goal Type'] = goal_type
-                                df.loc[mask, 'Target Amount'] = target_amount
-                                df.loc[mask, 'Current Savings'] = current_savings
-                                df.loc[mask, 'Target Date'] = new_target_date.strftime("%m/%d/%Y")
-                                df.loc[mask, 'Priority'] = priority
-                                
-                                # Calculate progress
-                                progress = (current_savings / target_amount * 100) if target_amount > 0 else 0
-                                df.loc[mask, 'Progress (%)'] = progress
-                                
-                                # Update Last Updated field
-                                df.loc[mask, 'Last Updated'] = datetime.now().strftime("%m/%d/%Y")
-                                
-                                # Calculate goal timeline
-                                months_difference = ((new_target_date.year - datetime.now().year) * 12 + 
-                                                   (new_target_date.month - datetime.now().month))
-                                
-                                if months_difference <= 12:
-                                    timeline = "Short-term"
-                                elif months_difference <= 60:
-                                    timeline = "Medium-term"
-                                else:
-                                    timeline = "Long-term"
-                                
-                                df.loc[mask, 'Goal Timeline'] = timeline
-                                
-                                # Save the changes
-                                df.to_csv(goals_file, index=False)
-                                
-                                # Force a file sync
-                                with open(goals_file, 'r+') as f:
-                                    f.flush()
-                                    os.fsync(f.fileno())
-                                
-                                # Verify the change
-                                verification_df = pd.read_csv(goals_file)
-                                verify_mask = verification_df['Goal ID'] == goal_id
-                                
-                                if any(verify_mask) and abs(verification_df.loc[verify_mask, 'Target Amount'].values[0] - target_amount) < 0.01:
-                                    st.success(f"Goal updated successfully!")
-                                    # Reset form state
-                                    st.session_state.show_modification_form = False
-                                    # Force page reload
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to verify the update. Please try again.")
+                            if updated:
+                                st.success(f"Goal updated successfully!")
+                                # Reset form state
+                                st.session_state.show_modification_form = False
+                                # Force page reload
+                                st.rerun()
                             else:
-                                st.error(f"Goal {goal_id} not found in file.")
+                                st.error(f"Failed to update goal {goal_id}. Please try again.")
                         except Exception as e:
                             st.error(f"Error updating goal: {str(e)}")
                 
@@ -628,41 +579,14 @@ def goal_planning_page():
                     submit_contribution = st.form_submit_button("Submit Contribution")
                     
                     if submit_contribution:
-                        # Direct modification of the CSV file
                         try:
-                            df = pd.read_csv(goals_file)
-                            
-                            # Find the row with the goal ID
-                            mask = df['Goal ID'] == goal_id
-                            
-                            if any(mask):
-                                # Update Current Savings
-                                current = df.loc[mask, 'Current Savings'].values[0]
-                                new_savings = current + contribution_amount
-                                df.loc[mask, 'Current Savings'] = new_savings
-                                
-                                # Update Progress
-                                target = df.loc[mask, 'Target Amount'].values[0]
-                                progress = (new_savings / target * 100) if target > 0 else 0
-                                df.loc[mask, 'Progress (%)'] = progress
-                                
-                                # Update Last Updated field
-                                df.loc[mask, 'Last Updated'] = datetime.now().strftime("%m/%d/%Y")
-                                
-                                # Save the changes
-                                df.to_csv(goals_file, index=False)
-                                
-                                # Force a file sync
-                                with open(goals_file, 'r+') as f:
-                                    f.flush()
-                                    os.fsync(f.fileno())
-                                
+                            if goal_manager.contribute_to_goal(goal_id, contribution_amount):
                                 st.success(f"Added ${contribution_amount:.2f} to your goal!")
                                 st.session_state.show_contribute_form = False
                                 # Force page reload
                                 st.rerun()
                             else:
-                                st.error(f"Goal {goal_id} not found in file.")
+                                st.error(f"Goal {goal_id} not found in the goal database.")
                         except Exception as e:
                             st.error(f"Error adding contribution: {str(e)}")
                 
@@ -989,11 +913,16 @@ def asset_recommendation_page():
             
             with st.spinner("Generating allocation strategy explanation..."):
                 try:
-                    # Get explanation for the recommended allocation
-                    explanation = allocation_agent.explain_allocation_strategy(
+                    # Stream the explanation for the recommended allocation as it is generated
+                    placeholder = st.empty()
+                    explanation = ""
+                    for chunk in allocation_agent.stream_allocation_strategy(
                         risk_profile=risk_category,
                         goal_timeline=time_horizon
-                    )
+                    ):
+                        explanation += chunk
+                        placeholder.markdown(clean_response_text(explanation))
+                    placeholder.empty()
                     
                     # Display the explanation with proper formatting
                     display_formatted_response(explanation)
@@ -1082,6 +1082,33 @@ def generate_asset_allocation_data(users: List[Dict[str, Any]]) -> None:
             # Add allocation to goal
             goal["allocation"] = goal_allocation
 
+def write_csv(path: str, rows: List[Dict[str, Any]]) -> None:
+    """
+    Write rows to a CSV file atomically.
+
+    The rows go to a temporary file next to the target, which is synced and
+    then moved into place with os.replace, so a running app reading the data
+    sees either the old file or the new one, never a half-written file.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        if rows:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+    # Sync the directory so the rename itself survives a crash (not possible on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
 def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
     """Write all data to CSV files in the specified output directory."""
     ensure_directory(output_path)
@@ -1102,11 +1129,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
             "Employment Type": user["employment_type"]
         })
     
-    with open(os.path.join(output_path, "user_profile_data.csv"), "w", newline="") as f:
-        if user_profile_data:
-            writer = csv.DictWriter(f, fieldnames=user_profile_data[0].keys())
-            writer.writeheader()
-            writer.writerows(user_profile_data)
+    write_csv(os.path.join(output_path, "user_profile_data.csv"), user_profile_data)
     
     # Write financial goals data
     financial_goals_data = []
@@ -1125,11 +1148,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
                 "Progress (%)": goal["progress_percentage"]  # Add progress percentage
             })
     
-    with open(os.path.join(output_path, "financial_goals_data.csv"), "w", newline="") as f:
-        if financial_goals_data:
-            writer = csv.DictWriter(f, fieldnames=financial_goals_data[0].keys())
-            writer.writeheader()
-            writer.writerows(financial_goals_data)
+    write_csv(os.path.join(output_path, "financial_goals_data.csv"), financial_goals_data)
     
     # Write budget data
     budget_data = []
@@ -1144,11 +1163,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
                 "% Utilized": budget["% Utilized"]  # Use the original column name
             })
     
-    with open(os.path.join(output_path, "budget_data.csv"), "w", newline="") as f:
-        if budget_data:
-            writer = csv.DictWriter(f, fieldnames=budget_data[0].keys())
-            writer.writeheader()
-            writer.writerows(budget_data)
+    write_csv(os.path.join(output_path, "budget_data.csv"), budget_data)
     
     # Write subscription data
     subscription_data = []
@@ -1163,11 +1178,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
                 "Last Billed Date": subscription["last_billed_date"]
             })
     
-    with open(os.path.join(output_path, "subscription_data.csv"), "w", newline="") as f:
-        if subscription_data:
-            writer = csv.DictWriter(f, fieldnames=subscription_data[0].keys())
-            writer.writeheader()
-            writer.writerows(subscription_data)
+    write_csv(os.path.join(output_path, "subscription_data.csv"), subscription_data)
     
     # Write transaction data - Using exact column names expected by the agent
     transaction_data = []
@@ -1197,11 +1208,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
             
             transaction_data.append(transaction_entry)
     
-    with open(os.path.join(output_path, "transactions_data.csv"), "w", newline="") as f:
-        if transaction_data:
-            writer = csv.DictWriter(f, fieldnames=transaction_data[0].keys())
-            writer.writeheader()
-            writer.writerows(transaction_data)
+    write_csv(os.path.join(output_path, "transactions_data.csv"), transaction_data)
     
     # Write asset allocation data
     asset_allocation_data = []
@@ -1220,11 +1227,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
             "Last Rebalanced": format_date(random_date(CURRENT_DATE - datetime.timedelta(days=90), CURRENT_DATE))
         })
     
-    with open(os.path.join(output_path, "current_asset_allocation.csv"), "w", newline="") as f:
-        if asset_allocation_data:
-            writer = csv.DictWriter(f, fieldnames=asset_allocation_data[0].keys())
-            writer.writeheader()
-            writer.writerows(asset_allocation_data)
+    write_csv(os.path.join(output_path, "current_asset_allocation.csv"), asset_allocation_data)
     
     # Write goal-specific asset allocation data
     goal_allocation_data = []
@@ -1245,11 +1248,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
                     "Commodities %": goal["allocation"]["Commodities"]
                 })
     
-    with open(os.path.join(output_path, "goal_specific_allocations.csv"), "w", newline="") as f:
-        if goal_allocation_data:
-            writer = csv.DictWriter(f, fieldnames=goal_allocation_data[0].keys())
-            writer.writeheader()
-            writer.writerows(goal_allocation_data)
+    write_csv(os.path.join(output_path, "goal_specific_allocations.csv"), goal_allocation_data)
     
     # Write expanded risk profile data
     risk_profile_data = []
@@ -1266,11 +1265,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
             "Time Horizon": user["time_horizon"]
         })
     
-    with open(os.path.join(output_path, "expanded_risk_profiles.csv"), "w", newline="") as f:
-        if risk_profile_data:
-            writer = csv.DictWriter(f, fieldnames=risk_profile_data[0].keys())
-            writer.writeheader()
-            writer.writerows(risk_profile_data)
+    write_csv(os.path.join(output_path, "expanded_risk_profiles.csv"), risk_profile_data)
     
     # Write asset allocation matrix
     asset_allocation_matrix = []
@@ -1290,11 +1285,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
                 "Commodities %": allocation["Commodities"]
             })
     
-    with open(os.path.join(output_path, "asset_allocation_matrix.csv"), "w", newline="") as f:
-        if asset_allocation_matrix:
-            writer = csv.DictWriter(f, fieldnames=asset_allocation_matrix[0].keys())
-            writer.writeheader()
-            writer.writerows(asset_allocation_matrix)
+    write_csv(os.path.join(output_path, "asset_allocation_matrix.csv"), asset_allocation_matrix)
     
     # Write enhanced goal data
     enhanced_goal_data = []
@@ -1317,11 +1308,7 @@ def write_csv_files(users: List[Dict[str, Any]], output_path: str) -> None:
                 "Progress (%)": goal["progress_percentage"]
             })
     
-    with open(os.path.join(output_path, "enhanced_goal_data.csv"), "w", newline="") as f:
-        if enhanced_goal_data:
-            writer = csv.DictWriter(f, fieldnames=enhanced_goal_data[0].keys())
-            writer.writeheader()
-            writer.writerows(enhanced_goal_data)
+    write_csv(os.path.join(output_path, "enhanced_goal_data.csv"), enhanced_goal_data)
 
 def main():
     """Main function to generate and save all synthetic data."""
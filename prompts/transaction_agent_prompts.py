@@ -1,299 +1,260 @@
 """
 Transaction Analysis Agent Prompts
 
-This module contains all the prompt templates required for the Transaction Analysis Agent
-in the Personal Finance Manager application.
+This module exposes all the prompt templates required for the Transaction Analysis Agent
+in the Personal Finance Manager application. The templates themselves live as .txt
+assets under prompts/transaction/ and are loaded the first time they are accessed.
 """
 
-class TransactionAnalysisPrompts:
-    """
-    Collection of prompts for the Transaction Analysis Agent functionality.
-    
-    These prompts are designed to work with the sample data structure and
-    focus on transaction categorization and nudge generation.
+import hashlib
+import os
+import pickle
+import re
+import sys
+import textwrap
+from enum import Enum
+from string import Formatter
+
+from utils.prompt_loader import load_prompt
+
+# Directory holding one .txt asset per prompt (e.g. BUDGET_ALERT_PROMPT -> budget_alert.txt)
+PROMPT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "transaction")
+
+try:
+    # Optional bundle of every prompt, generated by tools/compile_prompts.py
+    from prompts.transaction._compiled import DATA as _COMPILED_DATA
+except ImportError:
+    _BUNDLE = {}
+else:
+    _BUNDLE = pickle.loads(_COMPILED_DATA)
+
+
+def _bundled_text(prompt):
     """
-    
-    # System initialization prompt that defines the agent's role and capabilities
-    SYSTEM_PROMPT = """
-    You are the Transaction Analysis Agent, a specialized financial assistant responsible for analyzing customer transaction data, categorizing spending patterns, and generating personalized financial nudges. 
-    ONLY OUTPUT the Nudges
-   
-    Your capabilities include:
-    1. Categorizing transactions based on merchant category codes
-    2. Detecting spending patterns across transaction history
-    3. Identifying potential financial events (like salary deposits or bill payments)
-    4. Generating personalized financial nudges based on predefined templates
-    5. Aligning nudges with the user's financial goals
-
-    When prompted, analyze the provided transaction data and user information, then generate appropriate financial nudges that would be valuable for the user.
-
-    When responding:
-    1. Keep your analysis focused on patterns relevant to the user's goals
-    2. Prioritize nudges by potential impact and relevance
-    3. Format nudges in natural, conversational language
-    4. Include relevant transaction data as supporting evidence
-    5. Do not make assumptions and stick to the given data.
-    6. If a nudge is already prvided on a certain transaction, do not provide another nudge on the same transaction.
-
-   CRITICAL FORMATTING REQUIREMENTS:
-   1. ALWAYS format monetary values as "$ 123.45" with a space after the dollar sign
-   2. ALWAYS add spaces between words - never allow words to run together
-   3. ALWAYS format transaction IDs with a space after them: "TX12345 "
-   4. NEVER allow character-by-character spacing in the output (like "1 0 0")
-   5. ALWAYS use proper spacing in descriptive phrases (like "per month" not "permonth")
-
-   These formatting standards are non-negotiable and must be followed perfectly.
-   
-   Make sure to ONLY OUTPUT Nudges.
+    Return a prompt's text from the compiled bundle if it is still current.
+
+    The bundle records the modification time and size of each .txt asset it
+    was built from. An asset edited since then is read from disk instead, so
+    a stale bundle never shadows it.
+
+    Args:
+        prompt: Prompt member to look up
+
+    Returns:
+        The bundled text, or None if the prompt is not bundled or out of date
     """
-    
-    # Main transaction analysis prompt
-    TRANSACTION_ANALYSIS_PROMPT = """
-    Analyze the following transaction data for {customer_id}:
+    entry = _BUNDLE.get(prompt.value)
+    if not isinstance(entry, tuple):
+        return None
 
-    {transaction_data}
+    mtime_ns, size, text = entry
+    try:
+        stat = os.stat(prompt.path)
+    except OSError:
+        # Shipped without the .txt assets; the bundle is all there is
+        return text
+    if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+        return None
+    return text
 
-    The customer has the following profile information:
-    {user_profile}
 
-    The customer has set these financial goals:
-    {financial_goals}
+# Whitespace normalization applied to every prompt as it is loaded
+_SPACES = re.compile(r"[ \t]+")
+_TRAILING_SPACES = re.compile(r" \n")
+_BLANK_LINES = re.compile(r"\n{3,}")
 
-    The customer's budget information:
-    {budget_data}
 
-    The customer has these active subscriptions:
-    {subscription_data}
+def _clean(text):
+    """
+    Normalize a prompt once, when it is first loaded.
 
-    Based on this information:
-    1. Identify the top spending categories
-    2. Detect any unusual spending patterns
-    3. Identify any relevant financial events
-    4. Generate personalized financial nudges that are aligned with the customer's goals
-    5. Prioritize the nudges by importance and potential impact
-    6. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-    7. Use % sign where necessary
-      
-   Make sure you are separating TEXT such as "$ 283.96 in the Diningcategory" not "283.96intheDiningcategory"
+    Strips any indentation, collapses runs of spaces and tabs, trailing
+    spaces and extra blank lines, and interns the result so every reference
+    shares a single copy.
 
+    Args:
+        text: Raw prompt text
+
+    Returns:
+        The normalized, interned prompt text
     """
-    
-    # General nudge generation prompt
-    NUDGE_GENERATION_PROMPT = """
-    Based on the transaction analysis for {customer_id}, generate personalized financial nudges for the following patterns:
+    text = textwrap.dedent(text)
+    text = _SPACES.sub(" ", text)
+    text = _TRAILING_SPACES.sub("\n", text)
+    text = _BLANK_LINES.sub("\n\n", text)
+    return sys.intern(text.strip())
 
-    1. Budget Threshold Alerts: 
-    - Check if any budget category is approaching or exceeding the monthly limit
-    - Consider the user's goal priorities when suggesting adjustments
 
-    2. Subscription Review Opportunities:
-    - Identify total subscription spending
-    - Highlight potential savings opportunities
+def _compile(template):
+    """
+    Pre-parse a prompt template into (literal, field, spec, conversion) chunks.
 
-    3. Spending Pattern Insights:
-    - Compare spending against historical patterns
-    - Connect spending behaviors to goal progress
+    Args:
+        template: Prompt template using plain ``{field}`` placeholders
 
-    4. Goal Progress Acceleration:
-    - Suggest specific actions that could accelerate progress toward financial goals
-    - Quantify the potential impact of recommended changes
+    Returns:
+        List of chunks as produced by ``string.Formatter().parse``
+    """
+    return list(Formatter().parse(template))
 
-    5. Event-Based Nudges:
-    - Identify financial events such as salary deposits, bill payments, or unusual transactions
-    - Provide context-specific recommendations based on these events
 
-   1. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-   2. Use % sign where necessary
-   
+def _make_renderer(parsed):
     """
-    
-    # Budget-specific analysis prompt
-    BUDGET_ALERT_PROMPT = """
-    Review the budget data for {customer_id}:
-    {budget_data}
-
-    Generate appropriate budget alert nudges considering:
-    - Categories exceeding 80% of monthly limit
-    - Explain in detail about the budget allocated, and how much has been used.
-    - Historical spending patterns in these categories from transaction data
-    - Connection to the user's active financial goals
-    Please follow the Sample output strictly.
-    Sample Output: "You have spent $ 283.96  in the Dining category, which is 70.45.96 % of the allocated budget of $ 403.08"
-
-    Format each budget alert as a helpful observation with an actionable suggestion.
-    
-   1. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-   2. Use % sign where necessary
-      
+    Build a function that renders a pre-parsed prompt template.
+
+    The template is turned into the source of a function returning a single
+    f-string and compiled once, so rendering runs CPython's f-string opcodes
+    instead of the ``str.format`` machinery. Prompt templates are static,
+    trusted assets; no user input ever reaches the generated source.
+
+    Args:
+        parsed: Chunks returned by ``_compile``, using plain ``{field}`` placeholders
+
+    Returns:
+        A function taking the template fields as keyword arguments (extra
+        keyword arguments are ignored) and returning the rendered prompt
     """
-    
-    # Subscription-specific analysis prompt
-    SUBSCRIPTION_ANALYSIS_PROMPT = """
-    Analyze the subscription data for {customer_id}:
-    {subscription_data}
-
-    Calculate:
-    - Total monthly subscription cost
-    - Annual subscription expenditure
-    - Percentage of income spent on subscriptions
-    - Potential savings opportunities
-
-    Generate subscription-related nudges that highlight:
-    - Total subscription burden
-    - Specific high-cost subscriptions
-    - Impact of subscription costs on financial goals
-    - Actionable recommendations for optimization
-    
-   
-   1. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-   2. Use % sign where necessary      
+    fields = list(dict.fromkeys(field for _, field, _, _ in parsed if field))
+    for field in fields:
+        if not field.isidentifier():
+            raise ValueError(f"Unsupported prompt field: {field!r}")
+
+    body = "".join(
+        literal.replace("{", "{{").replace("}", "}}") + ("{" + field + "}" if field else "")
+        for literal, field, _, _ in parsed
+    )
+    params = ", ".join(["*", *fields, "**_"] if fields else ["**_"])
+    namespace = {}
+    exec(f"def _render({params}):\n    return f{body!r}\n", namespace)
+    return namespace["_render"]
+
+
+class Prompt(str, Enum):
     """
-    
-    # Goal alignment analysis prompt
-    GOAL_ALIGNMENT_PROMPT = """
-    Based on the financial goals for {customer_id}:
-    {financial_goals}
-
-    And recent transaction data:
-    {transaction_data}
-
-    Generate goal-oriented nudges that:
-    - Connect spending behaviors to goal progress
-    - Highlight specific transactions that either support or hinder goal achievement
-    - Suggest concrete adjustments that could accelerate goal achievement
-    - Quantify the impact of suggested changes (e.g., "Reducing dining expenses by $100/month could help you reach your vacation goal 2 months sooner")
-   
-   1. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-   2. Use % sign where necessary
-        
+    Prompt assets available to the Transaction Analysis Agent.
+
+    Each member's value is the stem of its .txt file in PROMPT_DIR.
     """
-    
-    # Recurring charge change prompt (event-based)
-    RECURRING_CHARGE_PROMPT = """
-    Analyze the subscription and transaction data for {customer_id}:
-    
-    Subscription Data:
-    {subscription_data}
-    
-    Transaction Data:
-    {transaction_data}
-    
-    Generate a recurring charge change nudge that:
-    1. Identifies any subscription charges that have changed in amount
-    2. Compares the new amount to the previous amount
-    3. Calculates the impact of this change over time (monthly, yearly)
-    4. Provides context on whether this change was expected
-    5. Suggests actions the customer might want to take based on the change
-    
-    
-   1. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-   2. Use % sign where necessary     
+
+    FORMATTING_RULES = "formatting_rules"
+    SYSTEM = "system"
+    TRANSACTION_ANALYSIS = "transaction_analysis"
+    NUDGE_GENERATION = "nudge_generation"
+    BUDGET_ALERT = "budget_alert"
+    SUBSCRIPTION_ANALYSIS = "subscription_analysis"
+    GOAL_ALIGNMENT = "goal_alignment"
+    RECURRING_CHARGE = "recurring_charge"
+    GOAL_MILESTONE = "goal_milestone"
+    SALARY_DEPOSIT = "salary_deposit"
+    UNUSUAL_ACTIVITY = "unusual_activity"
+    RESPONSE_FORMATTING = "response_formatting"
+
+    @property
+    def path(self):
+        """Path to the .txt asset backing this prompt."""
+        return os.path.join(PROMPT_DIR, self.value + ".txt")
+
+
+class _PromptRegistry(type):
     """
-    
-    # Goal milestone prompt (event-based)
-    GOAL_MILESTONE_PROMPT = """
-    Analyze the following financial goals for {customer_id}:
-    {financial_goals}
-    
-    Generate a goal milestone nudge that:
-    1. Identifies specific goals that have reached significant milestones (e.g., 25%, 50%, 75%) and explain in detail about the goal and how much is remaning.
-    2. Congratulates the customer on their progress and tell them the progress
-    3. Provides an updated timeline for goal completion based on current progress
-    4. Suggests ways to accelerate progress even further
-    5. Relates this achievement to their overall financial health
-    
-    
-   1. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-   2. Use % sign where necessary     
+    Metaclass that resolves prompt attributes lazily from PROMPT_DIR.
+
+    The first access to ``NAME_PROMPT`` reads the asset of the matching
+    ``Prompt`` member (from the compiled bundle when it is up to date). Derived
+    forms are built from it on first access as well:
+
+    - ``NAME_PROMPT_PARSED``: the template pre-parsed into its chunks
+    - ``NAME_PROMPT_RENDER``: a compiled function rendering the template
+    - ``NAME_PROMPT_HASH``: a 16-byte blake2b fingerprint of the prompt's UTF-8 text
+
+    Every value is then stored on the class, so later lookups are plain
+    attribute reads.
     """
-    
-    # Salary deposit prompt (event-based)
-    SALARY_DEPOSIT_PROMPT = """
-    Analyze the transaction data for {customer_id} to identify salary deposit patterns:
-    
-    Transaction Data:
-    {transaction_data}
-    
-    User Profile:
-    {user_profile}
-    
-    Financial Goals:
-    {financial_goals}
-    
-    Generate a salary deposit nudge that:
-    1. Identifies the recent salary deposit with amount and date
-    2. Suggests optimal allocation of this income based on their goals
-    3. Recommends specific actions that align with their financial priorities
-    4. If applicable, suggests automating transfers to savings or investment accounts
-    
-   
-   1. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-   2. Use % sign where necessary    
+
+    def __getattr__(cls, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if name.endswith("_PARSED"):
+            value = _compile(getattr(cls, name[:-len("_PARSED")]))
+        elif name.endswith("_RENDER"):
+            value = _make_renderer(getattr(cls, name[:-len("_RENDER")] + "_PARSED"))
+        elif name.endswith("_HASH"):
+            value = hashlib.blake2b(getattr(cls, name[:-len("_HASH")]).encode("utf-8"), digest_size=16).digest()
+        else:
+            try:
+                prompt = Prompt(name.lower().removesuffix("_prompt"))
+            except ValueError:
+                raise AttributeError(f"{cls.__name__} has no prompt {name!r}") from None
+            text = _bundled_text(prompt)
+            if text is None:
+                text = load_prompt(prompt.path)
+            value = _clean(text)
+
+        setattr(cls, name, value)
+        return value
+
+
+class TransactionAnalysisPrompts(metaclass=_PromptRegistry):
     """
+    Collection of prompts for the Transaction Analysis Agent functionality.
     
-    # Unusual activity prompt (event-based)
-    UNUSUAL_ACTIVITY_PROMPT = """
-    Analyze the transaction data for {customer_id}:
-    
-    Transaction Data:
-    {transaction_data}
-    
-    Generate an unusual activity nudge that:
-    1. Identifies specific transactions that appear unusual (based on amount, merchant, location, etc.)
-    2. You must Explain why these transactions stand out from normal patterns
-    3. Ask if these transactions were authorized
-    4. Provide guidance on monitoring account activity
-    5. Suggest security measures if appropriate
-    
-    
-   1. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-   2. Use % sign where necessary     
+    These prompts are designed to work with the sample data structure and
+    focus on transaction categorization and nudge generation. Each attribute
+    is backed by a ``Prompt`` asset and loaded on first access. The class is
+    a namespace only and cannot be instantiated.
     """
 
-    TRANSACTION_FORMATTING_GUIDE = """
-CRITICAL FORMATTING REQUIREMENTS:
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        raise TypeError(f"{cls.__name__} is a namespace and cannot be instantiated")
 
-1. FORMAT ALL MONETARY VALUES with these exact rules:
-   - Always include a dollar sign with a space after it: "$ 100" NOT "$100"
-   - When mentioning dollar amounts in text: "$ 100 per month" NOT "100permonth"
-   - Include commas for thousands: "$ 1,200" NOT "$ 1200"
+    # Output formatting rules shared by every prompt, sent once at the start of the system message
+    FORMATTING_RULES: str
 
-2. FORMAT ALL TRANSACTION IDs with these exact rules:
-   - Always include a space after the transaction ID: "TX12345 " NOT "TX12345"
-   - When referencing transaction amounts: "TX12345 ($ 100)" NOT "TX12345($100)"
-   - Include spaces inside and outside parentheses: " ($ 100) " NOT "(100)"
+    # System initialization prompt that defines the agent's role and capabilities
+    SYSTEM_PROMPT: str
+
+    # Main transaction analysis prompt
+    TRANSACTION_ANALYSIS_PROMPT: str
 
-3. ENSURE PROPER SPACING between all words:
-   - Words must have spaces between them: "towards the Education goal" NOT "towardstheEducationgoal"
-   - Numbers and words must have spaces: "$ 100 per month" NOT "$ 100permonth"
-   - Transaction IDs and descriptions must have spaces: "TX12345 from Merchant" NOT "TX12345fromMerchant"
+    # General nudge generation prompt
+    NUDGE_GENERATION_PROMPT: str
 
-4. FORMAT RANGES correctly:
-   - Use proper spacing around hyphens: "$ 200 - $ 500" NOT "$ 200-$ 500"
+    # Budget-specific analysis prompt
+    BUDGET_ALERT_PROMPT: str
 
-EVERY numeric value, transaction ID, and piece of text MUST follow these exact formatting rules.
-"""
+    # Subscription-specific analysis prompt
+    SUBSCRIPTION_ANALYSIS_PROMPT: str
+
+    # Goal alignment analysis prompt
+    GOAL_ALIGNMENT_PROMPT: str
+
+    # Recurring charge change prompt (event-based)
+    RECURRING_CHARGE_PROMPT: str
 
-   # Enhance the RESPONSE_FORMATTING_PROMPT with these explicit instructions
-    RESPONSE_FORMATTING_PROMPT = """
-   Format the financial nudges into a cohesive response for the customer. 
-
-   CRITICAL FORMATTING REQUIREMENTS:
-   1. Every single monetary amount must be formatted as "$ 123.45" (with a space after the $ sign)
-   2. Every single transaction ID must have a space after it: "TX12345 " not "TX12345"
-   3. All words must have proper spacing between them - NO words should run together
-   4. All parenthetical amounts must be formatted as " ($ 123.45) " (with spaces inside and outside)
-   5. Descriptions like "per month" or "towards the goal" must have proper spaces between words
-   6. EVERY descriptive phrase must have proper spaces: "per month" not "permonth"
-   7. NEVER output text with character-by-character spacing (like "1 0 0" or "p e r")
-   8. NUMBERS running into TEXT must be separated: "$ 100 per month" not "$ 100permonth"
-
-   Start with a brief overview of the customer's financial situation, then present the nudges in order of priority.
-   For each nudge, include:
-   - Observation: What was detected in the data
-   - Impact: Why this matters to the customer
-   - Recommendation: Specific action the customer can take
-   - Benefit: The positive outcome of taking this action
-
-   Organize the nudges in a clean, readable format with clear headings and concise language.
-   """
\ No newline at end of file
+    # Goal milestone prompt (event-based)
+    GOAL_MILESTONE_PROMPT: str
+
+    # Salary deposit prompt (event-based)
+    SALARY_DEPOSIT_PROMPT: str
+
+    # Unusual activity prompt (event-based)
+    UNUSUAL_ACTIVITY_PROMPT: str
+
+    # Formats the generated nudges into the final customer response
+    RESPONSE_FORMATTING_PROMPT: str
+
+
+def preload():
+    """
+    Load and compile every prompt ahead of the first request.
+
+    Prompts are otherwise resolved on first access, which puts the file reads
+    and template compilation on the path of the first user turn. Agents call
+    this once at startup.
+    """
+    for prompt in Prompt:
+        name = prompt.name if prompt is Prompt.FORMATTING_RULES else prompt.name + "_PROMPT"
+        getattr(TransactionAnalysisPrompts, name + "_RENDER")
@@ -0,0 +1,54 @@
+"""
+tools/compile_prompts.py
+
+Prompt Bundling Tool for Personal Finance Manager
+
+This script bundles the Transaction Analysis prompt assets into a generated
+module, prompts/transaction/_compiled.py, holding a single pickled bytes
+constant. When the bundle is present the prompts are served from it, so a
+fresh interpreter imports one cached module instead of opening every .txt
+asset. Each entry records the modification time and size of its source, and
+a prompt whose .txt has changed since is read from disk instead. Re-run it
+after editing prompts to bring the bundle up to date.
+
+Usage:
+    python tools/compile_prompts.py
+"""
+
+import os
+import pickle
+import sys
+
+# Get the directory of the current script
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Compute the path to the project root (one level up from the 'tools' folder)
+project_root = os.path.join(current_dir, '..')
+
+# Add the project root to sys.path
+sys.path.append(project_root)
+
+from prompts.transaction_agent_prompts import Prompt, PROMPT_DIR
+from utils.prompt_loader import load_prompt
+
+# Generated module that holds the bundled prompts
+COMPILED_MODULE = os.path.join(PROMPT_DIR, "_compiled.py")
+
+
+def main():
+    """Bundle every prompt asset into the generated module."""
+    prompts = {}
+    for prompt in Prompt:
+        stat = os.stat(prompt.path)
+        prompts[prompt.value] = (stat.st_mtime_ns, stat.st_size, load_prompt(prompt.path))
+    data = pickle.dumps(prompts, protocol=5)
+
+    with open(COMPILED_MODULE, "w", encoding="utf-8") as f:
+        f.write('"""Generated by tools/compile_prompts.py - do not edit."""\n\n')
+        f.write(f"DATA = {data!r}\n")
+
+    print(f"Bundled {len(prompts)} prompts into {COMPILED_MODULE}")
+
+
+if __name__ == "__main__":
+    main()
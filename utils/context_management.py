@@ -8,9 +8,68 @@ detecting context-dependent queries, and rewriting queries to include
 necessary context from previous conversation turns.
 """
 
-from typing import List, Dict, Tuple
+import functools
+import json
+import re
+import string
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from utils.llm_response import generate_text
 
+# System prompt for deciding whether a query needs context and rewriting it if so
+REWRITE_SYSTEM_PROMPT = "You are an expert in conversation context management for financial chatbots, specializing in identifying when user queries need additional context and creating coherent, complete queries from fragmented or context-dependent user inputs."
+
+# Signs that a query depends on the previous conversation
+REWRITE_CRITERIA = """The current query needs context if it:
+1. Is very short (e.g., just a number, date, or few words) or a yes/no answer
+2. Contains pronouns without clear referents (it, that, this, etc.)
+3. Answers a question the assistant just asked
+4. Mentions amounts, percentages, dates or timelines without saying what they are for
+5. Continues a previous discussion about a goal, investment or budget"""
+
+# Prompt that decides whether a query needs context and rewrites it if so. Static
+# instructions come first so every call shares the provider's cached prompt prefix.
+_REWRITE_TEMPLATE = string.Template("""
+You are the query rewriter of a personal finance chatbot. Decide whether the user's current query needs context from the previous conversation to be understood, and if so, rewrite it as a complete, standalone query.
+
+""" + REWRITE_CRITERIA + """
+
+When rewriting, connect bare amounts and dates to the goal or question they belong to, frame answers as complete statements, and keep the user's intent. Only include details (goal names, amounts, dates) explicitly mentioned in the conversation.
+
+Previous conversation:
+${history}
+
+Current user query: "${query}"
+
+Respond ONLY as JSON: {"needs_rewrite": true or false, "rewritten": "<the rewritten query, or empty if no rewrite is needed>"}
+""")
+
+# Words that may refer back to something earlier in the conversation. "that" and
+# "this" are just as often a conjunction or determiner, so a match only leaves
+# the decision to the LLM rather than forcing a rewrite.
+_PRONOUN_RE = re.compile(r"\b(it|that|this|them|those|they|he|she)\b", re.IGNORECASE)
+
+# JSON object in a rewrite response, possibly surrounded by other text
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# System prompt for summarizing the older part of a conversation
+SUMMARY_SYSTEM_PROMPT = "You summarize conversations between a user and a personal finance chatbot, keeping every goal, amount, date and decision that was mentioned."
+
+# Maximum number of conversation summaries kept in memory
+MAX_SUMMARIES = 256
+
+# Queries of at most this many words are assumed to need context
+SHORT_QUERY_WORDS = 3
+
+# Queries of at least this many words without pronouns are assumed to be self-contained
+LONG_QUERY_WORDS = 12
+
+# Number of most recent messages sent with queries the heuristic leaves to the LLM
+UNDECIDED_HISTORY_MESSAGES = 2
+
+
 class ContextManager:
     """
     Manages conversation context and query rewriting for the Financial Advisor Agent.
@@ -24,202 +83,309 @@ class ContextManager:
             max_history: Maximum number of conversation turns to keep in history
         """
         self.max_history = max_history
+        
+        # Summaries of the turns that fell out of the recent window, keyed by
+        # those turns, so conversations of different users never share one
+        self._summaries: "OrderedDict[Tuple[Tuple[str, str], ...], str]" = OrderedDict()
+        self._pending_summaries = set()
+        self._summary_lock = threading.Lock()
+        self._summary_executor = ThreadPoolExecutor(max_workers=2)
     
-    def should_rewrite_query(self, 
-                            current_query: str, 
-                            chat_history: List[Dict[str, str]]) -> bool:
+    def _heuristic_should_rewrite(self, current_query: str) -> Optional[bool]:
         """
-        Determine if the current query needs to be rewritten based on conversation history.
-        Uses LLM to check if the query seems incomplete and needs context from history.
+        Decide cheaply whether a query needs rewriting, when the answer is clear.
+        
+        Very short queries almost always depend on the previous conversation,
+        while long queries without pronouns rarely do. Everything else,
+        including any query with a possible pronoun, is left to the LLM.
         
         Args:
             current_query: The current user query
-            chat_history: List of previous conversation turns
             
         Returns:
-            True if the query should be rewritten, False otherwise
+            True or False when the query is clear-cut, None if the LLM should decide
         """
-        # If no history, no need to rewrite
-        if not chat_history or len(chat_history) < 2:
-            return False
-        
-        # Get relevant chat history (just the last few turns)
-        recent_history = chat_history[-min(self.max_history*2, len(chat_history)):]
+        word_count = len(current_query.split())
+        has_pronoun = _PRONOUN_RE.search(current_query) is not None
         
-        # Use LLM to determine if the query needs to be rewritten
-        return self._llm_should_rewrite(current_query, recent_history)
+        if word_count <= SHORT_QUERY_WORDS:
+            return True
+        if word_count >= LONG_QUERY_WORDS and not has_pronoun:
+            return False
+        return None
     
-    def _llm_should_rewrite(self, 
-                           current_query: str, 
-                           chat_history: List[Dict[str, str]]) -> bool:
+    def rewrite_query(self, 
+                     current_query: str, 
+                     chat_history: List[Dict[str, str]]) -> Tuple[str, bool]:
         """
-        Use LLM to determine if query rewriting is needed.
+        Rewrite the current query to include context from conversation history.
+        
+        A single LLM call both decides whether the query needs context and
+        rewrites it, after a local heuristic has filtered out clear-cut cases.
         
         Args:
             current_query: The current user query
             chat_history: List of previous conversation turns
             
         Returns:
-            True if the query should be rewritten, False otherwise
+            Tuple of (rewritten query, whether rewriting occurred)
         """
+        # If no history, no need to rewrite
+        if not chat_history or len(chat_history) < 2:
+            return current_query, False
+        
+        # Clear-cut queries are decided locally without an LLM call
+        should_rewrite = self._heuristic_should_rewrite(current_query)
+        if should_rewrite is False:
+            return current_query, False
+        
+        # Short queries get the full window and summary to rewrite from. Undecided
+        # queries are mostly self-contained, and when they are not they usually
+        # follow on from the last exchange, so only that is sent.
+        if should_rewrite is None:
+            formatted_history = self._format_chat_history(chat_history[-UNDECIDED_HISTORY_MESSAGES:])
+        else:
+            formatted_history = self._format_recent_history(chat_history)
+        
         try:
-            # Format chat history for the prompt
-            formatted_history = self._format_chat_history(chat_history)
-            
-            # Create prompt for rewrite determination - enhanced for comprehensive detection
-            prompt = f"""
-You are an AI assistant for a personal finance chatbot helping determine if a user's current query seems incomplete and needs context from the previous conversation to be fully understood.
-
-Previous conversation:
-{formatted_history}
-
-Current user query: "{current_query}"
-
-The current query might be incomplete and need additional context if it:
-1. Is very short (e.g., just a number, date, or few words)
-2. Contains pronouns without clear referents (it, that, this, etc.)
-3. Appears to be a direct response to a question from the assistant
-4. Contains financial values without clear context (dollar amounts, percentages)
-5. Contains dates or timelines that seem to reference an earlier topic
-6. Mentions amounts, targets, or values without specifying what they're for
-7. Is continuing a previous financial discussion (about goals, investments, etc.)
-8. Is a yes/no/maybe type answer that needs the previous question for context
-
-In a financial chatbot, pay particular attention to:
-- Numbers or amounts without context ("5000" - what is this amount for?)
-- Dates without context ("December 31, 2026" - deadline for what?)
-- Short answers that clearly respond to a previous question
-- Any reference to a financial goal, amount, or timeline that seems to continue a previous conversation
-
-Does this query need additional context from previous conversation to be properly understood?
-Answer with YES if the query seems incomplete and would benefit from rewriting with context.
-Answer with NO only if the query is self-contained and complete on its own.
-
-Answer with just YES or NO.
-"""
-            
-            system_prompt = "You are an expert in conversational context analysis for financial chatbots. Your job is to identify when user queries need additional context to be properly understood."
-            
             response = generate_text(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=0,  # Use 0 temperature for deterministic output
-                max_tokens=10   # Very few tokens needed
+                prompt=self._build_rewrite_prompt(current_query, formatted_history),
+                system_prompt=REWRITE_SYSTEM_PROMPT,
+                temperature=0,  # Deterministic, so repeated turns hit the response cache
+                max_tokens=300   # Allow enough tokens for a thorough rewrite
             )
-            
-            # Check if the response indicates rewriting is needed
-            return "YES" in response.upper()
-            
         except Exception as e:
-            # If there's an error with the LLM, err on the side of caution
-            print(f"Error in LLM rewrite determination: {str(e)}")
-            # For very short queries, assume context is needed even if LLM fails
-            if len(current_query.split()) <= 3:
-                print("LLM failed but query is very short, assuming context is needed")
-                return True
-            return False
+            # If there's an error with the LLM, return the original query
+            print(f"Error in query rewriting: {str(e)}")
+            return current_query, False
+        
+        return self._apply_rewrite_response(current_query, response, should_rewrite)
     
-    def rewrite_query(self, 
-                     current_query: str, 
-                     chat_history: List[Dict[str, str]]) -> Tuple[str, bool]:
+    def _apply_rewrite_response(self,
+                                current_query: str,
+                                response: str,
+                                should_rewrite: Optional[bool]) -> Tuple[str, bool]:
         """
-        Rewrite the current query to include context from conversation history.
+        Turn the LLM's rewrite response into the query to use.
         
         Args:
             current_query: The current user query
-            chat_history: List of previous conversation turns
+            response: Raw response to the rewrite prompt
+            should_rewrite: True if the heuristic already decided the query needs
+                context, None if the decision was left to the LLM
             
         Returns:
             Tuple of (rewritten query, whether rewriting occurred)
         """
-        # Check if rewriting is needed using LLM
-        if not self.should_rewrite_query(current_query, chat_history):
+        needs_rewrite, rewritten_query = self._parse_rewrite_response(response)
+        if not (should_rewrite or needs_rewrite):
             return current_query, False
         
-        # Get relevant chat history
-        recent_history = chat_history[-min(self.max_history*2, len(chat_history)):]
+        # Clean up the rewritten query
+        rewritten_query = rewritten_query.strip()
+        
+        # If the rewritten query is empty or too similar to the original, return the original
+        if not rewritten_query or rewritten_query.lower() == current_query.lower():
+            return current_query, False
+        
+        print(f"Original query: '{current_query}'")
+        print(f"Rewritten query: '{rewritten_query}'")
+        
+        return rewritten_query, True
+    
+    def _parse_rewrite_response(self, response: str) -> Tuple[bool, str]:
+        """
+        Parse the JSON answer to the rewrite prompt.
+        
+        Args:
+            response: Raw response to the rewrite prompt
+            
+        Returns:
+            Tuple of (whether the query needs rewriting, rewritten query); a
+            response that cannot be parsed counts as not needing a rewrite
+        """
+        match = _JSON_OBJECT_RE.search(response)
+        if match is None:
+            print(f"Could not find JSON in rewrite response: {response}")
+            return False, ""
         
         try:
-            # Format chat history for the prompt
-            formatted_history = self._format_chat_history(recent_history)
+            result = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            print(f"Could not parse rewrite response: {response}")
+            return False, ""
+        
+        if not isinstance(result, dict):
+            return False, ""
+        
+        return bool(result.get("needs_rewrite")), str(result.get("rewritten") or "")
+    
+    def _format_recent_history(self, chat_history: List[Dict[str, str]]) -> str:
+        """
+        Format the most recent turns of chat history for the rewrite prompt.
+        
+        Turns older than the recent window are replaced by a rolling summary,
+        which keeps the prompt size bounded however long the conversation gets.
+        
+        Args:
+            chat_history: List of previous conversation turns
             
-            # Create enhanced prompt for query rewriting
-            prompt = f"""
-You are an AI assistant for a personal finance management chatbot. Your task is to rewrite incomplete user queries to include necessary context from the previous conversation.
-
-Previous conversation:
-{formatted_history}
-
-Current user query: "{current_query}"
-
-This query appears to be incomplete or context-dependent. Rewrite it to be a complete, standalone query that incorporates all relevant context from the conversation history.
-
-Specifically for financial conversations:
-1. If the user mentioned a number or amount without context (e.g., "5000"), clarify what this amount refers to based on the conversation
-2. If the user mentioned a date without explaining what it's for (e.g., "December 31, 2026"), connect it to the relevant goal or deadline
-3. If the user is continuing a discussion about a specific financial goal, include the goal type and details
-4. If the user is answering a previous question, frame it as a complete statement
-
-Guidelines for rewriting:
-- Create a natural-sounding complete query that captures the user's intent
-- Include all relevant context (goal types, amounts, timeframes) from previous messages
-- Be specific but concise - include only details that were explicitly mentioned
-- Ensure the rewritten query would make sense to someone who hasn't seen the previous conversation
-- Maintain the user's original intent and meaning
-
-Only include factual details (goal names, amounts, dates, etc.) that were explicitly mentioned in the conversation history.
-
-Rewritten query:
-"""
+        Returns:
+            Formatted recent chat history as text
+        """
+        window = self.max_history * 2
+        formatted = self._format_chat_history(chat_history[-window:])
+        
+        older_turns = tuple(
+            (message.get("role", "unknown"), message.get("content", ""))
+            for message in chat_history[:-window]
+        )
+        summary = self._get_summary(older_turns)
+        if not summary:
+            return formatted
+        
+        return f"Summary so far: {summary}\n\nRecent turns:\n{formatted}"
+    
+    def _get_summary(self, older_turns: Tuple[Tuple[str, str], ...]) -> str:
+        """
+        Get the summary of the turns older than the recent window.
+        
+        Summarizing happens in the background so it never delays the current
+        turn. Until the summary of these exact turns is ready, the summary of
+        the longest already summarized prefix is used.
+        
+        Args:
+            older_turns: (role, content) pairs older than the recent window
             
-            system_prompt = "You are an expert in conversation context management for financial chatbots, specializing in creating coherent, complete queries from fragmented or context-dependent user inputs."
+        Returns:
+            The best available summary, or an empty string
+        """
+        if not older_turns:
+            return ""
+        
+        with self._summary_lock:
+            summary = self._summaries.get(older_turns)
+            if summary is not None:
+                self._summaries.move_to_end(older_turns)
+                return summary
             
-            rewritten_query = generate_text(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=1e-8,  # Use near-zero temperature for consistent output
-                max_tokens=300   # Allow enough tokens for a thorough rewrite
-            )
+            if older_turns not in self._pending_summaries:
+                self._pending_summaries.add(older_turns)
+                self._summary_executor.submit(self._summarize, older_turns)
             
-            # Clean up the rewritten query
-            rewritten_query = rewritten_query.strip()
+            return self._longest_summarized_prefix(older_turns)[1]
+    
+    def _longest_summarized_prefix(self, older_turns: Tuple[Tuple[str, str], ...]) -> Tuple[int, str]:
+        """
+        Find the longest prefix of older_turns that already has a summary.
+        
+        Must be called with the summary lock held.
+        
+        Args:
+            older_turns: (role, content) pairs older than the recent window
             
-            # If the rewritten query is empty or too similar to the original, return the original
-            if not rewritten_query or rewritten_query.lower() == current_query.lower():
-                return current_query, False
+        Returns:
+            Tuple of (prefix length, its summary), or (0, "") if there is none
+        """
+        for length in range(len(older_turns) - 1, 0, -1):
+            summary = self._summaries.get(older_turns[:length])
+            if summary is not None:
+                return length, summary
+        return 0, ""
+    
+    def _summarize(self, older_turns: Tuple[Tuple[str, str], ...]):
+        """
+        Summarize older turns, extending the summary of an already summarized prefix.
+        
+        Args:
+            older_turns: (role, content) pairs older than the recent window
+        """
+        try:
+            with self._summary_lock:
+                prefix_length, previous_summary = self._longest_summarized_prefix(older_turns)
             
-            print(f"Original query: '{current_query}'")
-            print(f"Rewritten query: '{rewritten_query}'")
+            new_turns = _format_history(older_turns[prefix_length:])
+            if previous_summary:
+                prompt = (
+                    f"Summary of the conversation so far:\n{previous_summary}\n\n"
+                    f"Later turns:\n{new_turns}\n\n"
+                    "Update the summary to include the later turns. Keep it under 100 words "
+                    "and keep every goal, amount, date and decision mentioned. "
+                    "Respond with the summary only."
+                )
+            else:
+                prompt = (
+                    f"Conversation:\n{new_turns}\n\n"
+                    "Summarize this conversation in under 100 words, keeping every goal, "
+                    "amount, date and decision mentioned. Respond with the summary only."
+                )
             
-            return rewritten_query, True
+            summary = generate_text(
+                prompt=prompt,
+                system_prompt=SUMMARY_SYSTEM_PROMPT,
+                temperature=0,  # Deterministic, so repeated summaries are served from cache
+                max_tokens=200
+            ).strip()
             
+            with self._summary_lock:
+                self._summaries[older_turns] = summary
+                if len(self._summaries) > MAX_SUMMARIES:
+                    self._summaries.popitem(last=False)
+        
         except Exception as e:
-            # If there's an error with the LLM, return the original query
-            print(f"Error in query rewriting: {str(e)}")
-            return current_query, False
+            print(f"Error summarizing conversation history: {str(e)}")
+        
+        finally:
+            with self._summary_lock:
+                self._pending_summaries.discard(older_turns)
+    
+    def _build_rewrite_prompt(self, current_query: str, formatted_history: str) -> str:
+        """
+        Build the prompt asking the LLM whether a query needs context, and to rewrite it if so.
+        
+        Args:
+            current_query: The current user query
+            formatted_history: Chat history formatted for prompts
+            
+        Returns:
+            The query rewriting prompt
+        """
+        return _REWRITE_TEMPLATE.substitute(history=formatted_history, query=current_query)
     
     def _format_chat_history(self, chat_history: List[Dict[str, str]]) -> str:
         """
         Format chat history for inclusion in prompts.
         
+        Formatting is memoized on the (role, content) pairs, so the same
+        recent history is only formatted once across the calls of a turn.
+        
         Args:
             chat_history: List of previous conversation turns
             
         Returns:
             Formatted chat history as text
         """
-        formatted_history = []
+        return _format_history(tuple(
+            (message.get("role", "unknown"), message.get("content", ""))
+            for message in chat_history
+        ))
+
+
+@functools.lru_cache(maxsize=128)
+def _format_history(history: Tuple[Tuple[str, str], ...]) -> str:
+    """
+    Format (role, content) pairs of chat history as text.
+    
+    Args:
+        history: Conversation turns as (role, content) pairs
         
-        for message in chat_history:
-            role = message.get("role", "unknown")
-            content = message.get("content", "")
-            
-            if role == "user":
-                formatted_history.append(f"User: {content}")
-            elif role == "assistant":
-                # Truncate assistant responses if they're very long
-                if len(content) > 500:
-                    content = content[:497] + "..."
-                formatted_history.append(f"Assistant: {content}")
-        
-        return "\n\n".join(formatted_history)
\ No newline at end of file
+    Returns:
+        Formatted chat history as text
+    """
+    # Assistant responses are truncated if they're very long
+    return "\n\n".join([
+        f"User: {content}" if role == "user"
+        else f"Assistant: {content[:497] + '...' if len(content) > 500 else content}"
+        for role, content in history
+        if role in ("user", "assistant")
+    ])
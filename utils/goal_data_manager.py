@@ -1,26 +1,81 @@
 """
-Fixed GoalDataManager with reliable file synchronization for update operations.
-This fixes the issue where updates through chat don't appear in the Goal Planning page.
+GoalDataManager, the goal database shared by the chat agents and the Goal Planning page,
+so updates made through chat appear on the page on its next read.
+
+Goals are stored in a SQLite database in WAL mode, indexed by Goal ID and
+Customer ID. The database is seeded from enhanced_goal_data.csv, and reseeded
+whenever the contents of that CSV change.
 """
 
+import hashlib
+import io
 import os
+import sqlite3
+import threading
 import pandas as pd
+from bisect import bisect_left
+from contextlib import contextmanager
 from datetime import datetime
 import logging
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, 
+logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('GoalDataManager')
 
+# Goal timelines by months to the target date: up to 12, up to 60, and beyond
+_TIMELINE_BOUNDARIES = (12, 60)
+_TIMELINE_BUCKETS = ("Short-term", "Medium-term", "Long-term")
+
+
 class GoalDataManager:
     """
     Manager for goal-related data operations.
     
-    This class handles creation, retrieval, updating, and deletion of goals.
-    Fixed to ensure reliable file synchronization for all operations.
+    This class handles creation, retrieval, updating, and deletion of goals
+    in the goal database. Every read sees all committed changes.
     """
     
+    # Columns of the goals table, in the order of the goals CSV
+    _HEADERS = (
+        "Goal ID", "Customer ID", "Goal Name", "Target Amount", "Current Savings",
+        "Target Date", "Goal Type", "Goal Timeline", "Monthly Contribution",
+        "Priority", "Start Date", "Last Updated", "Automatic Contribution", "Progress (%)"
+    )
+    
+    # Map snake_case update_goal parameter names to Title Case column names
+    _COLUMN_MAPPING = {
+        'goal_type': 'Goal Type',
+        'goal_name': 'Goal Name',
+        'target_amount': 'Target Amount',
+        'current_savings': 'Current Savings',
+        'target_date': 'Target Date',
+        'monthly_contribution': 'Monthly Contribution',
+        'priority': 'Priority',
+        'progress_percentage': 'Progress (%)'
+    }
+    
+    # Map Title Case column names to database columns
+    _DB_COLUMNS = {
+        "Goal ID": "goal_id",
+        "Customer ID": "customer_id",
+        "Goal Name": "goal_name",
+        "Target Amount": "target_amount",
+        "Current Savings": "current_savings",
+        "Target Date": "target_date",
+        "Goal Type": "goal_type",
+        "Goal Timeline": "goal_timeline",
+        "Monthly Contribution": "monthly_contribution",
+        "Priority": "priority",
+        "Start Date": "start_date",
+        "Last Updated": "last_updated",
+        "Automatic Contribution": "automatic_contribution",
+        "Progress (%)": "progress_percentage"
+    }
+    
+    # Selects every goal column under its Title Case name
+    _SELECT = "SELECT " + ", ".join(f'{column} AS "{header}"' for header, column in _DB_COLUMNS.items()) + " FROM goals"
+    
     def __init__(self, data_path="./data"):
         """
         Initialize the Goal Data Manager.
@@ -29,47 +84,174 @@ class GoalDataManager:
             data_path (str): Path to the directory containing data files
         """
         self.data_path = data_path
-        self.goals_file = os.path.join(data_path, "enhanced_goal_data.csv")
+        self.goals_file = os.path.join(data_path, "enhanced_goal_data.db")
+        self.goals_csv_file = os.path.join(data_path, "enhanced_goal_data.csv")
+        
+        # Autocommit mode; multi-statement changes open their own transactions
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.goals_file, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
         
-        # Ensure the data files exist
+        # Create the goal database, seeding it from the goals CSV if needed
         self._ensure_data_files_exist()
         
         logger.info(f"GoalDataManager initialized with data path: {data_path}")
-        logger.info(f"Goals file: {self.goals_file}")
+        logger.info(f"Goal database: {self.goals_file}")
+    
+    @staticmethod
+    def _months_until(target_date, today):
+        """
+        Count calendar months from today to a target date.
+        
+        Args:
+            target_date (str): Target date in MM/DD/YYYY format
+            today (datetime): Reference date
+        
+        Returns:
+            int: Months to the target date (negative if it has passed)
+        """
+        target_datetime = datetime.strptime(target_date, "%m/%d/%Y")
+        return (target_datetime.year - today.year) * 12 + (target_datetime.month - today.month)
+    
+    @classmethod
+    def _timeline(cls, months):
+        """
+        Classify a goal by the months left to its target date.
+        
+        Args:
+            months (int): Months to the target date
+        
+        Returns:
+            str: "Short-term", "Medium-term" or "Long-term"
+        """
+        return _TIMELINE_BUCKETS[bisect_left(_TIMELINE_BOUNDARIES, months)]
     
     def _ensure_data_files_exist(self):
-        """Ensure the necessary data files exist."""
+        """
+        Ensure the goals tables exist and hold the contents of the goals CSV.
+        
+        The hash of the CSV last imported is kept in the goals_source table.
+        When the CSV differs from it (for example after the data generator has
+        been re-run), the goals table is replaced with the CSV's rows and the
+        goal ID counter restarts from them. Goals created or edited since the
+        last import are discarded in that case.
+        """
         try:
-            if not os.path.exists(self.goals_file):
-                # Create the file with headers if it doesn't exist
-                headers = [
-                    "Goal ID", "Customer ID", "Goal Name", "Target Amount", "Current Savings",
-                    "Target Date", "Goal Type", "Goal Timeline", "Monthly Contribution", 
-                    "Priority", "Start Date", "Last Updated", "Automatic Contribution", "Progress (%)"
-                ]
+            with self._transaction():
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS goals ("
+                    "goal_id TEXT PRIMARY KEY, customer_id TEXT NOT NULL, goal_name TEXT, "
+                    "target_amount REAL, current_savings REAL, target_date TEXT, goal_type TEXT, "
+                    "goal_timeline TEXT, monthly_contribution REAL, priority TEXT, start_date TEXT, "
+                    "last_updated TEXT, automatic_contribution TEXT, progress_percentage REAL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_goals_customer_id ON goals (customer_id)")
+                
+                # Last goal number handed out, so IDs of deleted goals are never reused
+                self._conn.execute("CREATE TABLE IF NOT EXISTS goal_id_seq (last_num INTEGER NOT NULL)")
+                
+                # Hash of the CSV the goals table was last seeded from
+                self._conn.execute("CREATE TABLE IF NOT EXISTS goals_source (csv_hash TEXT NOT NULL)")
+                
+                if not os.path.exists(self.goals_csv_file):
+                    return
+                
+                with open(self.goals_csv_file, "rb") as f:
+                    csv_bytes = f.read()
+                csv_hash = hashlib.blake2b(csv_bytes, digest_size=16).hexdigest()
+                
+                row = self._conn.execute("SELECT csv_hash FROM goals_source").fetchone()
+                if row is not None and row[0] == csv_hash:
+                    return
                 
-                df = pd.DataFrame(columns=headers)
-                df.to_csv(self.goals_file, index=False)
-                logger.info(f"Created new goals file: {self.goals_file}")
+                df = pd.read_csv(io.BytesIO(csv_bytes)).reindex(columns=list(self._HEADERS))
+                # Plain Python values (and None for missing cells) for sqlite3
+                df = df.astype(object).where(df.notna(), None)
+                placeholders = ", ".join("?" * len(self._DB_COLUMNS))
+                
+                self._conn.execute("DELETE FROM goals")
+                self._conn.execute("DELETE FROM goal_id_seq")
+                self._conn.executemany(
+                    f"INSERT INTO goals ({', '.join(self._DB_COLUMNS.values())}) VALUES ({placeholders})",
+                    df.itertuples(index=False, name=None)
+                )
+                self._conn.execute("DELETE FROM goals_source")
+                self._conn.execute("INSERT INTO goals_source (csv_hash) VALUES (?)", (csv_hash,))
+                
+                logger.info(f"Imported {len(df)} goals from {self.goals_csv_file} into {self.goals_file}")
         except Exception as e:
             logger.error(f"Error ensuring data files exist: {str(e)}")
     
-    def _flush_file_after_write(self, file_path):
+    @contextmanager
+    def _transaction(self):
+        """
+        Run a block of statements in a single write transaction.
+        
+        Nested blocks join the outermost transaction, which commits when it
+        exits and rolls back if it raises.
+        """
+        with self._lock:
+            if self._conn.in_transaction:
+                yield
+                return
+            
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def _next_goal_id(self):
+        """
+        Allocate the next goal ID. Must be called inside _transaction().
+        
+        The counter is seeded from the highest existing goal ID the first
+        time it is used.
+        
+        Returns:
+            str: The new goal ID, e.g. "GOAL42"
+        """
+        row = self._conn.execute("SELECT last_num FROM goal_id_seq").fetchone()
+        if row is None:
+            last_num = max(
+                (int(goal_id[4:]) for goal_id, in self._conn.execute("SELECT goal_id FROM goals")
+                 if goal_id.startswith("GOAL") and goal_id[4:].isdigit()),
+                default=0
+            )
+            self._conn.execute("INSERT INTO goal_id_seq (last_num) VALUES (?)", (last_num,))
+        else:
+            last_num = row[0]
+        
+        num = last_num + 1
+        self._conn.execute("UPDATE goal_id_seq SET last_num = ?", (num,))
+        return f"GOAL{num}"
+    
+    def _fetch_goal(self, goal_id):
         """
-        Force a file system sync after writing to a file to ensure changes are persisted.
+        Read a goal row.
         
         Args:
-            file_path: Path to the file to sync
+            goal_id (str): The goal ID
+        
+        Returns:
+            dict or None: The goal keyed by Title Case column name, or None if not found
         """
-        try:
-            # This is a more reliable way to ensure file system sync
-            if os.path.exists(file_path):
-                with open(file_path, 'r+') as f:
-                    f.flush()
-                    os.fsync(f.fileno())
-                logger.info(f"File sync forced for {file_path}")
-        except Exception as e:
-            logger.error(f"Error flushing file {file_path}: {str(e)}")
+        with self._lock:
+            row = self._conn.execute(f"{self._SELECT} WHERE goal_id = ?", (goal_id,)).fetchone()
+        return None if row is None else dict(zip(self._DB_COLUMNS, row))
+    
+    def get_all_goals(self):
+        """
+        Get every goal.
+        
+        Returns:
+            pandas.DataFrame: DataFrame containing all goals
+        """
+        with self._lock:
+            return pd.read_sql_query(f"{self._SELECT} ORDER BY rowid", self._conn)
     
     def get_user_goals(self, customer_id):
         """
@@ -77,18 +259,15 @@ class GoalDataManager:
         
         Args:
             customer_id (str): The customer ID
-            
+        
         Returns:
             pandas.DataFrame: DataFrame containing the customer's goals
         """
         try:
-            # Read directly from file, bypassing any caching
-            if os.path.exists(self.goals_file):
-                df = pd.read_csv(self.goals_file)
-                return df[df['Customer ID'] == customer_id]
-            else:
-                logger.warning(f"Goals file not found: {self.goals_file}")
-                return pd.DataFrame()
+            with self._lock:
+                return pd.read_sql_query(
+                    f"{self._SELECT} WHERE customer_id = ? ORDER BY rowid", self._conn, params=(customer_id,)
+                )
         except Exception as e:
             logger.error(f"Error getting user goals: {str(e)}")
             return pd.DataFrame()
@@ -99,25 +278,18 @@ class GoalDataManager:
         
         Args:
             goal_id (str): The goal ID
-            
+        
         Returns:
             dict or None: Dictionary containing the goal data, or None if not found
         """
         try:
-            # Read directly from file, bypassing any caching
-            if os.path.exists(self.goals_file):
-                df = pd.read_csv(self.goals_file)
-                goal = df[df['Goal ID'] == goal_id]
-                
-                if goal.empty:
-                    logger.warning(f"Goal not found: {goal_id}")
-                    return None
-                
-                # Convert to dictionary for easier access
-                return goal.iloc[0].to_dict()
-            else:
-                logger.warning(f"Goals file not found: {self.goals_file}")
+            goal = self._fetch_goal(goal_id)
+            
+            if goal is None:
+                logger.warning(f"Goal not found: {goal_id}")
                 return None
+            
+            return goal
         except Exception as e:
             logger.error(f"Error getting goal by ID: {str(e)}")
             return None
@@ -137,7 +309,7 @@ class GoalDataManager:
             current_savings (float, optional): Current savings toward the goal
             monthly_contribution (float, optional): Monthly contribution amount
             priority (str, optional): Priority level (Very High, High, Medium, Low)
-            
+        
         Returns:
             str: ID of the created goal
         """
@@ -146,37 +318,10 @@ class GoalDataManager:
             if goal_type is None:
                 goal_type = goal_name
             
-            # Read existing goals
-            if os.path.exists(self.goals_file):
-                df = pd.read_csv(self.goals_file)
-            else:
-                # Create new DataFrame if file doesn't exist
-                df = pd.DataFrame(columns=[
-                    "Goal ID", "Customer ID", "Goal Name", "Target Amount", "Current Savings",
-                    "Target Date", "Goal Type", "Goal Timeline", "Monthly Contribution", 
-                    "Priority", "Start Date", "Last Updated", "Automatic Contribution", "Progress (%)"
-                ])
-            
-            # Generate a new goal ID
-            if df.empty:
-                goal_id = "GOAL1"
-            else:
-                # Extract numeric part of the last goal ID and increment
-                last_id = df['Goal ID'].iloc[-1]
-                num = int(last_id.replace("GOAL", ""))
-                goal_id = f"GOAL{num + 1}"
-            
             # Calculate goal timeline based on target date
             today = datetime.now()
-            target_datetime = datetime.strptime(target_date, "%m/%d/%Y")
-            months_difference = (target_datetime.year - today.year) * 12 + (target_datetime.month - today.month)
-            
-            if months_difference <= 12:
-                goal_timeline = "Short-term"
-            elif months_difference <= 60:
-                goal_timeline = "Medium-term"
-            else:
-                goal_timeline = "Long-term"
+            months_difference = self._months_until(target_date, today)
+            goal_timeline = self._timeline(months_difference)
             
             # Calculate monthly contribution if not provided
             if monthly_contribution is None:
@@ -189,34 +334,38 @@ class GoalDataManager:
             # Calculate progress percentage
             progress_percentage = (current_savings / target_amount * 100) if target_amount > 0 else 0
             
-            # Create new goal row
-            new_goal = {
-                "Goal ID": goal_id,
-                "Customer ID": customer_id.lower(),  # Normalize to lowercase for consistency
-                "Goal Name": goal_name,
-                "Target Amount": float(target_amount),
-                "Current Savings": float(current_savings),
-                "Target Date": target_date,
-                "Goal Type": goal_type,
-                "Goal Timeline": goal_timeline,
-                "Monthly Contribution": float(monthly_contribution),
-                "Priority": priority,
-                "Start Date": today.strftime("%m/%d/%Y"),
-                "Last Updated": today.strftime("%m/%d/%Y"),
-                "Automatic Contribution": "Yes",
-                "Progress (%)": float(progress_percentage)
-            }
-            
-            # Add the new goal
-            df = pd.concat([df, pd.DataFrame([new_goal])], ignore_index=True)
-            
-            # Save to file with explicit sync
-            df.to_csv(self.goals_file, index=False)
-            self._flush_file_after_write(self.goals_file)
+            with self._transaction():
+                # Generate a new goal ID
+                goal_id = self._next_goal_id()
+                
+                # Create new goal row
+                new_goal = {
+                    "Goal ID": goal_id,
+                    "Customer ID": customer_id.lower(),  # Normalize to lowercase for consistency
+                    "Goal Name": goal_name,
+                    "Target Amount": float(target_amount),
+                    "Current Savings": float(current_savings),
+                    "Target Date": target_date,
+                    "Goal Type": goal_type,
+                    "Goal Timeline": goal_timeline,
+                    "Monthly Contribution": float(monthly_contribution),
+                    "Priority": priority,
+                    "Start Date": today.strftime("%m/%d/%Y"),
+                    "Last Updated": today.strftime("%m/%d/%Y"),
+                    "Automatic Contribution": "Yes",
+                    "Progress (%)": float(progress_percentage)
+                }
+                
+                # Add the new goal
+                columns = ", ".join(self._DB_COLUMNS[header] for header in new_goal)
+                placeholders = ", ".join("?" * len(new_goal))
+                self._conn.execute(
+                    f"INSERT INTO goals ({columns}) VALUES ({placeholders})", tuple(new_goal.values())
+                )
             
             logger.info(f"Goal created: {goal_id} for customer {customer_id}")
             return goal_id
-            
+        
         except Exception as e:
             logger.error(f"Error creating goal: {str(e)}")
             raise
@@ -228,7 +377,7 @@ class GoalDataManager:
         Args:
             goal_id (str): ID of the goal to update
             **kwargs: Goal attributes to update (in snake_case)
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
@@ -238,110 +387,59 @@ class GoalDataManager:
                 logger.error(f"Invalid goal ID format: {goal_id}")
                 return False
             
-            # Read existing goals
-            if not os.path.exists(self.goals_file):
-                logger.error(f"Goals file not found: {self.goals_file}")
-                return False
-            
-            df = pd.read_csv(self.goals_file)
-            
-            # Check if the goal exists
-            goal_mask = df['Goal ID'] == goal_id
-            if not any(goal_mask):
-                logger.error(f"Goal not found: {goal_id}")
-                return False
-            
-            # Map snake_case parameter names to Title Case column names
-            column_mapping = {
-                'goal_type': 'Goal Type',
-                'goal_name': 'Goal Name',
-                'target_amount': 'Target Amount',
-                'current_savings': 'Current Savings',
-                'target_date': 'Target Date',
-                'monthly_contribution': 'Monthly Contribution',
-                'priority': 'Priority',
-                'progress_percentage': 'Progress (%)'
-            }
-            
-            # Log original values for debugging
-            original_values = {}
-            for key, column in column_mapping.items():
-                if key in kwargs and column in df.columns:
-                    original_values[column] = df.loc[goal_mask, column].values[0]
-            
-            logger.info(f"Updating goal {goal_id}: {kwargs}")
-            logger.info(f"Original values: {original_values}")
-            
-            # Apply updates with column name mapping
-            for key, value in kwargs.items():
-                # Map snake_case keys to actual column names
-                if key in column_mapping and column_mapping[key] in df.columns:
-                    column = column_mapping[key]
-                    df.loc[goal_mask, column] = value
-                    logger.info(f"Updated {column} to {value}")
-                else:
-                    logger.warning(f"Column not found for parameter {key}")
-            
-            # Update Last Updated field
-            today = datetime.now()
-            df.loc[goal_mask, 'Last Updated'] = today.strftime("%m/%d/%Y")
-            
-            # Recalculate Progress (%) if Current Savings or Target Amount changed
-            if 'current_savings' in kwargs or 'target_amount' in kwargs:
-                current_savings = df.loc[goal_mask, 'Current Savings'].values[0]
-                target_amount = df.loc[goal_mask, 'Target Amount'].values[0]
-                progress_percentage = (current_savings / target_amount * 100) if target_amount > 0 else 0
-                df.loc[goal_mask, 'Progress (%)'] = progress_percentage
-            
-            # Recalculate Goal Timeline if Target Date changed
-            if 'target_date' in kwargs:
-                target_date = df.loc[goal_mask, 'Target Date'].values[0]
-                try:
-                    target_datetime = datetime.strptime(target_date, "%m/%d/%Y")
-                    months_difference = (target_datetime.year - today.year) * 12 + (target_datetime.month - today.month)
-                    
-                    if months_difference <= 12:
-                        df.loc[goal_mask, 'Goal Timeline'] = "Short-term"
-                    elif months_difference <= 60:
-                        df.loc[goal_mask, 'Goal Timeline'] = "Medium-term"
+            with self._transaction():
+                # Check if the goal exists
+                goal = self._fetch_goal(goal_id)
+                if goal is None:
+                    logger.error(f"Goal not found: {goal_id}")
+                    return False
+                
+                # Log original values for debugging
+                original_values = {}
+                for key, column in self._COLUMN_MAPPING.items():
+                    if key in kwargs:
+                        original_values[column] = goal[column]
+                
+                logger.info(f"Updating goal {goal_id}: {kwargs}")
+                logger.info(f"Original values: {original_values}")
+                
+                # Apply updates with column name mapping
+                changes = {}
+                for key, value in kwargs.items():
+                    # Map snake_case keys to actual column names
+                    if key in self._COLUMN_MAPPING:
+                        column = self._COLUMN_MAPPING[key]
+                        goal[column] = changes[column] = value
+                        logger.info(f"Updated {column} to {value}")
                     else:
-                        df.loc[goal_mask, 'Goal Timeline'] = "Long-term"
-                except Exception as e:
-                    logger.error(f"Error calculating timeline: {str(e)}")
-            
-            # Save changes with explicit sync to ensure file is updated
-            df.to_csv(self.goals_file, index=False)
-            
-            # Force sync to disk
-            self._flush_file_after_write(self.goals_file)
-            
-            # Verify that the update was actually applied to the file
-            verification_df = pd.read_csv(self.goals_file)
-            verification_mask = verification_df['Goal ID'] == goal_id
-            
-            # Check if the goal still exists
-            if not any(verification_mask):
-                logger.error(f"Verification failed: Goal {goal_id} not found after update")
-                return False
-            
-            # Verify each updated field
-            for key, value in kwargs.items():
-                if key in column_mapping and column_mapping[key] in verification_df.columns:
-                    column = column_mapping[key]
-                    actual_value = verification_df.loc[verification_mask, column].values[0]
-                    
-                    # For numeric comparisons, handle floating point precision
-                    if isinstance(value, (int, float)) and isinstance(actual_value, (int, float)):
-                        if abs(actual_value - value) > 0.001:
-                            logger.error(f"Verification failed: {column} expected {value}, got {actual_value}")
-                            return False
-                    elif str(actual_value) != str(value):
-                        logger.error(f"Verification failed: {column} expected {value}, got {actual_value}")
-                        return False
+                        logger.warning(f"Column not found for parameter {key}")
+                
+                # Update Last Updated field
+                today = datetime.now()
+                changes['Last Updated'] = today.strftime("%m/%d/%Y")
+                
+                # Recalculate Progress (%) if Current Savings or Target Amount changed
+                if 'current_savings' in kwargs or 'target_amount' in kwargs:
+                    current_savings = goal['Current Savings']
+                    target_amount = goal['Target Amount']
+                    progress_percentage = (current_savings / target_amount * 100) if target_amount > 0 else 0
+                    changes['Progress (%)'] = progress_percentage
+                
+                # Recalculate Goal Timeline if Target Date changed
+                if 'target_date' in kwargs:
+                    try:
+                        changes['Goal Timeline'] = self._timeline(self._months_until(goal['Target Date'], today))
+                    except Exception as e:
+                        logger.error(f"Error calculating timeline: {str(e)}")
+                
+                assignments = ", ".join(f"{self._DB_COLUMNS[column]} = ?" for column in changes)
+                self._conn.execute(
+                    f"UPDATE goals SET {assignments} WHERE goal_id = ?", (*changes.values(), goal_id)
+                )
             
-            logger.info(f"Goal {goal_id} updated successfully and verified")
+            logger.info(f"Goal {goal_id} updated successfully")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error updating goal: {str(e)}")
             return False
@@ -352,7 +450,7 @@ class GoalDataManager:
         
         Args:
             goal_id (str): ID of the goal to delete
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
@@ -362,29 +460,18 @@ class GoalDataManager:
                 logger.error(f"Invalid goal ID format: {goal_id}")
                 return False
             
-            # Read existing goals
-            if not os.path.exists(self.goals_file):
-                logger.error(f"Goals file not found: {self.goals_file}")
-                return False
-            
-            df = pd.read_csv(self.goals_file)
+            # Delete the goal
+            with self._transaction():
+                deleted = self._conn.execute("DELETE FROM goals WHERE goal_id = ?", (goal_id,)).rowcount
             
-            # Check if the goal exists
-            goal_mask = df['Goal ID'] == goal_id
-            if not any(goal_mask):
+            # Check if the goal existed
+            if not deleted:
                 logger.error(f"Goal not found: {goal_id}")
                 return False
             
-            # Delete the goal
-            df = df[~goal_mask]
-            
-            # Save changes with explicit sync
-            df.to_csv(self.goals_file, index=False)
-            self._flush_file_after_write(self.goals_file)
-            
             logger.info(f"Goal deleted: {goal_id}")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error deleting goal: {str(e)}")
             return False
@@ -396,7 +483,7 @@ class GoalDataManager:
         Args:
             goal_id (str): ID of the goal
             amount (float): Amount to contribute
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
@@ -406,18 +493,26 @@ class GoalDataManager:
                 logger.error(f"Invalid contribution amount: {amount}")
                 return False
             
-            # Get the goal
-            goal = self.get_goal_by_id(goal_id)
-            if goal is None:
+            # Add the amount and recalculate progress in one statement; SET
+            # expressions see the row as it was before the update
+            with self._lock:
+                updated = self._conn.execute(
+                    "UPDATE goals SET "
+                    "current_savings = COALESCE(current_savings, 0) + ?, "
+                    "progress_percentage = CASE WHEN target_amount > 0 "
+                    "THEN (COALESCE(current_savings, 0) + ?) * 100.0 / target_amount ELSE 0 END, "
+                    "last_updated = ? "
+                    "WHERE goal_id = ?",
+                    (amount, amount, datetime.now().strftime("%m/%d/%Y"), goal_id)
+                ).rowcount
+            
+            if not updated:
                 logger.error(f"Goal not found: {goal_id}")
                 return False
             
-            # Calculate new current savings
-            new_savings = goal['Current Savings'] + amount
-            
-            # Update the goal
-            return self.update_goal(goal_id, Current_Savings=new_savings)
-            
+            logger.info(f"Added {amount} to goal {goal_id}")
+            return True
+        
         except Exception as e:
             logger.error(f"Error contributing to goal: {str(e)}")
-            return False
\ No newline at end of file
+            return False
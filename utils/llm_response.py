@@ -6,14 +6,138 @@ from dekallm.cloudeka.ai for the Personal Finance Manager application.
 """
 
 import os
-import json
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import orjson
 import requests
-from typing import Dict, Any, Optional, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from dotenv import load_dotenv
+from utils.response_cache import canonical_json
 
 # Load environment variables
 load_dotenv()
 
+# Connect and read timeouts (seconds) for API requests
+REQUEST_TIMEOUT = (3.05, 55)
+
+# Shared session so consecutive calls reuse pooled keep-alive connections
+# instead of paying a TCP and TLS handshake per request
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    # Retry failed connects and throttling/gateway errors, but not read
+    # errors: by then the server may already be generating the completion
+    max_retries=Retry(
+        total=2,
+        connect=2,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False
+    )
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# Seconds over which streamed tokens are coalesced before being handed to the caller
+STREAM_FLUSH_INTERVAL = 0.05
+
+# Maximum number of deterministic (temperature 0) responses kept in memory
+DETERMINISTIC_CACHE_SIZE = 4096
+
+# LRU of responses to temperature 0 calls, keyed by the full request
+_deterministic_cache: "OrderedDict[str, str]" = OrderedDict()
+_deterministic_cache_lock = threading.Lock()
+
+
+def _deterministic_key(
+        model_name: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        chat_history: Optional[List[Dict[str, str]]]
+    ) -> str:
+    """
+    Build the cache key of a deterministic request.
+    
+    Args:
+        model_name: Name of the model serving the request
+        prompt: The user prompt or query
+        system_prompt: Optional system instructions
+        max_tokens: Maximum tokens to generate
+        chat_history: Optional list of previous messages
+    
+    Returns:
+        Hex digest identifying the request
+    """
+    request = {
+        "model": model_name,
+        "sys": system_prompt,
+        "msgs": (chat_history or []) + [{"role": "user", "content": prompt}],
+        "max_tokens": max_tokens
+    }
+    return hashlib.sha256(canonical_json(request)).hexdigest()
+
+
+def _get_deterministic(key: str) -> Optional[str]:
+    """Look up a cached deterministic response, marking it as recently used."""
+    with _deterministic_cache_lock:
+        text = _deterministic_cache.get(key)
+        if text is not None:
+            _deterministic_cache.move_to_end(key)
+        return text
+
+
+def _set_deterministic(key: str, text: str) -> None:
+    """Cache a deterministic response, evicting the least recently used one if full."""
+    with _deterministic_cache_lock:
+        _deterministic_cache[key] = text
+        _deterministic_cache.move_to_end(key)
+        if len(_deterministic_cache) > DETERMINISTIC_CACHE_SIZE:
+            _deterministic_cache.popitem(last=False)
+
+
+@functools.lru_cache(maxsize=None)
+def _config() -> Tuple[str, str, str]:
+    """
+    Read the DekaLLM API settings from the environment, once per process.
+    
+    Returns:
+        Tuple of (API URL, API key, model name)
+    
+    Raises:
+        ValueError: If any of the settings is missing
+    """
+    api_url = os.getenv("DEKA_LLM_API_URL")
+    api_key = os.getenv("DEKA_LLM_API_KEY")
+    model_name = os.getenv("DEKA_LLM_MODEL_NAME")
+    
+    if not api_url or not api_key or not model_name:
+        raise ValueError(
+            "Missing required environment variables. "
+            "Please ensure DEKA_LLM_API_URL, DEKA_LLM_API_KEY, and DEKA_LLM_MODEL_NAME "
+            "are set in your .env file."
+        )
+    
+    return api_url, api_key, model_name
+
+
+@functools.lru_cache(maxsize=None)
+def _headers() -> Dict[str, str]:
+    """Build the default headers for API requests, once per process."""
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {_config()[1]}"
+    }
+
+
 class DekaLLMClient:
     """
     Client for interacting with the DekaLLM API.
@@ -24,33 +148,19 @@ class DekaLLMClient:
     
     def __init__(self):
         """Initialize the DekaLLM client with API credentials from environment variables."""
-        self.api_url = os.getenv("DEKA_LLM_API_URL")
-        self.api_key = os.getenv("DEKA_LLM_API_KEY")
-        self.model_name = os.getenv("DEKA_LLM_MODEL_NAME")
-        
-        if not self.api_url or not self.api_key or not self.model_name:
-            raise ValueError(
-                "Missing required environment variables. "
-                "Please ensure DEKA_LLM_API_URL, DEKA_LLM_API_KEY, and DEKA_LLM_MODEL_NAME "
-                "are set in your .env file."
-            )
-        
-        # Set default headers for API requests
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
+        self.api_url, self.api_key, self.model_name = _config()
+        self.headers = _headers()
     
-    def generate_response(
+    def _build_payload(
         self,
         prompt: str,
-        system_prompt: Optional[str] = None,
-        temperature: float = 1e-8,
-        max_tokens: int = 1000,
-        chat_history: Optional[List[Dict[str, str]]] = None
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        chat_history: Optional[List[Dict[str, str]]]
     ) -> Dict[str, Any]:
         """
-        Generate a response from the DekaLLM API.
+        Build the request payload for a chat completion.
         
         Args:
             prompt: The user prompt or query
@@ -60,10 +170,7 @@ class DekaLLMClient:
             chat_history: Optional list of previous messages for context
         
         Returns:
-            Dictionary containing the API response with generated text
-        
-        Raises:
-            Exception: If the API request fails
+            The JSON payload for the API request
         """
         # Prepare the messages list
         messages = []
@@ -87,26 +194,54 @@ class DekaLLMClient:
             "max_tokens": max_tokens
         }
         
+        return payload
+    
+    def generate_response(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 1e-8,
+        max_tokens: int = 1000,
+        chat_history: Optional[List[Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a response from the DekaLLM API.
+        
+        Args:
+            prompt: The user prompt or query
+            system_prompt: Optional system instructions to guide the model's behavior
+            temperature: Controls randomness in the response (0.0 to 1.0)
+            max_tokens: Maximum number of tokens to generate
+            chat_history: Optional list of previous messages for context
+        
+        Returns:
+            Dictionary containing the API response with generated text
+        
+        Raises:
+            Exception: If the API request fails
+        """
+        payload = self._build_payload(prompt, system_prompt, temperature, max_tokens, chat_history)
+        
         try:
             # Send the request to the API
-            response = requests.post(
+            response = _SESSION.post(
                 self.api_url,
                 headers=self.headers,
-                data=json.dumps(payload),
-                timeout=60  # Set a reasonable timeout
+                data=orjson.dumps(payload),
+                timeout=REQUEST_TIMEOUT
             )
             
             # Check if the request was successful
             response.raise_for_status()
             
             # Parse and return the JSON response
-            return response.json()
+            return orjson.loads(response.content)
             
         except requests.exceptions.HTTPError as http_err:
             error_message = f"HTTP error occurred: {http_err}"
             try:
-                error_detail = response.json()
-                error_message += f"\nAPI Error: {json.dumps(error_detail)}"
+                error_detail = orjson.loads(response.content)
+                error_message += f"\nAPI Error: {orjson.dumps(error_detail).decode()}"
             except:
                 error_message += f"\nResponse text: {response.text}"
             raise Exception(error_message)
@@ -120,9 +255,79 @@ class DekaLLMClient:
         except requests.exceptions.RequestException as err:
             raise Exception(f"Error making request to DekaLLM API: {err}")
             
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             raise Exception(f"Error parsing API response: {response.text}")
 
+    def stream_response(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 1e-8,
+        max_tokens: int = 1000,
+        chat_history: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[str]:
+        """
+        Stream a response from the DekaLLM API as it is generated.
+        
+        Args:
+            prompt: The user prompt or query
+            system_prompt: Optional system instructions to guide the model's behavior
+            temperature: Controls randomness in the response (0.0 to 1.0)
+            max_tokens: Maximum number of tokens to generate
+            chat_history: Optional list of previous messages for context
+        
+        Yields:
+            Pieces of the generated text, in order
+        
+        Raises:
+            Exception: If the API request fails
+        """
+        payload = self._build_payload(prompt, system_prompt, temperature, max_tokens, chat_history)
+        payload["stream"] = True
+        
+        try:
+            with _SESSION.post(
+                self.api_url,
+                headers=self.headers,
+                data=orjson.dumps(payload),
+                timeout=REQUEST_TIMEOUT,
+                stream=True
+            ) as response:
+                # Read the error body here, while the streamed connection is still open
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.HTTPError as http_err:
+                    raise Exception(f"HTTP error occurred: {http_err}\nResponse text: {response.text}")
+                
+                # Server-sent events rarely declare a charset, and requests would assume Latin-1
+                response.encoding = "utf-8"
+                
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    choices = orjson.loads(data).get("choices") or []
+                    if choices:
+                        content = choices[0].get("delta", {}).get("content")
+                        if content:
+                            yield content
+            
+        except requests.exceptions.ConnectionError:
+            raise Exception("Connection error: Failed to connect to the DekaLLM API")
+            
+        except requests.exceptions.Timeout:
+            raise Exception("Timeout error: The request to DekaLLM API timed out")
+            
+        except requests.exceptions.RequestException as err:
+            raise Exception(f"Error making request to DekaLLM API: {err}")
+            
+        except orjson.JSONDecodeError:
+            raise Exception(f"Error parsing API response: {line}")
+
     def extract_text_response(self, response: Dict[str, Any]) -> str:
         """
         Extract the text content from the API response.
@@ -151,11 +356,17 @@ class DekaLLMClient:
                 return response["generated_text"]
             
             # If we can't find the expected fields, return the full response for debugging
-            return f"Unexpected response format. Full response: {json.dumps(response)}"
+            return f"Unexpected response format. Full response: {orjson.dumps(response).decode()}"
             
         except Exception as e:
             raise ValueError(f"Error extracting text from response: {str(e)}")
     
+@functools.lru_cache(maxsize=1)
+def _get_client() -> DekaLLMClient:
+    """Create the DekaLLMClient shared by the utility functions below, once per process."""
+    return DekaLLMClient()
+
+
 # Simple utility function to make calls easier
 def generate_text(
         prompt: str,
@@ -177,7 +388,16 @@ def generate_text(
     Returns:
         Generated text as a string
     """
-    client = DekaLLMClient()
+    client = _get_client()
+    
+    # Temperature 0 calls are deterministic, so identical requests are served from memory
+    cache_key = None
+    if temperature == 0:
+        cache_key = _deterministic_key(client.model_name, prompt, system_prompt, max_tokens, chat_history)
+        cached_text = _get_deterministic(cache_key)
+        if cached_text is not None:
+            return cached_text
+    
     response = client.generate_response(
         prompt=prompt,
         system_prompt=system_prompt,
@@ -185,4 +405,53 @@ def generate_text(
         max_tokens=max_tokens,
         chat_history=chat_history
     )
-    return client.extract_text_response(response)
\ No newline at end of file
+    text = client.extract_text_response(response)
+    
+    if cache_key is not None:
+        _set_deterministic(cache_key, text)
+    
+    return text
+
+
+def stream_text(
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 1e-8,
+        max_tokens: int = 1000,
+        chat_history: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[str]:
+    """
+    Stream text from DekaLLM, coalescing tokens into chunks.
+    
+    Tokens arriving within STREAM_FLUSH_INTERVAL of each other are joined,
+    so callers redraw the UI at most every 50 ms rather than once per token.
+    Very short completions (such as YES/NO answers) are not streamed.
+    
+    Args:
+        prompt: The user prompt or query
+        system_prompt: Optional system instructions to guide the model
+        temperature: Controls randomness (0.0 to 1.0)
+        max_tokens: Maximum tokens to generate
+        chat_history: Optional list of previous messages
+    
+    Yields:
+        Chunks of the generated text, in order
+    """
+    if max_tokens <= 10:
+        yield generate_text(prompt, system_prompt, temperature, max_tokens, chat_history)
+        return
+    
+    client = _get_client()
+    buffer = []
+    last_flush = time.monotonic()
+    
+    for content in client.stream_response(prompt, system_prompt, temperature, max_tokens, chat_history):
+        buffer.append(content)
+        now = time.monotonic()
+        if now - last_flush >= STREAM_FLUSH_INTERVAL:
+            yield "".join(buffer)
+            buffer.clear()
+            last_flush = now
+    
+    if buffer:
+        yield "".join(buffer)
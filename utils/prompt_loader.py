@@ -0,0 +1,59 @@
+"""
+utils/prompt_loader.py
+
+Prompt Loading Utility for Personal Finance Manager
+
+This module loads prompt templates stored as .txt assets. Files are memory
+mapped so that worker processes serving the same prompts share the pages
+held in the OS page cache, and each file is read at most once per process.
+"""
+
+import functools
+import mmap
+import os
+
+
+# Error message interpolated only when the check fails
+_NOT_TXT_MESSAGE = "Prompt files must be .txt files: %s"
+
+
+def load_prompt(path: str | os.PathLike[str]) -> str:
+    """
+    Load a prompt template from a .txt file.
+
+    Paths are resolved with os.path.realpath before hitting the cache, so
+    "./a.txt" and "a.txt" share a single entry.
+
+    Args:
+        path: Path to the prompt file
+
+    Returns:
+        The prompt text
+
+    Raises:
+        ValueError: If the path does not point to a .txt file
+    """
+    path = os.fspath(path)
+    if not path.endswith(".txt"):
+        raise ValueError(_NOT_TXT_MESSAGE % path)
+
+    return _read_prompt(os.path.realpath(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_prompt(path: str) -> str:
+    """
+    Read a prompt file once per process.
+
+    Args:
+        path: Resolved path to the prompt file
+
+    Returns:
+        The prompt text
+    """
+    with open(path, "rb") as f:
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return bytes(mm).decode("utf-8")
@@ -0,0 +1,128 @@
+"""
+utils/response_cache.py
+
+LLM Response Cache Utility for Personal Finance Manager
+
+This module provides an exact-match cache for LLM responses, persisted in
+SQLite so that repeated requests over unchanged data (for example a user
+refreshing their nudges) skip the LLM call entirely.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+import orjson
+
+
+def canonical_json(value: Any) -> bytes:
+    """
+    Serialize a value to JSON deterministically.
+
+    Args:
+        value: JSON-serializable value; other objects are serialized with str()
+
+    Returns:
+        UTF-8 encoded JSON with sorted keys and no insignificant whitespace
+    """
+    return orjson.dumps(
+        value,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        default=str
+    )
+
+
+class ResponseCache:
+    """
+    SQLite-backed exact-match cache for LLM responses.
+
+    Keys are derived from the prompt name and the exact inputs used to render
+    it, so any change in the underlying data produces a new key.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: Optional[float] = 24 * 60 * 60):
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            ttl_seconds: Lifetime of a cached response, or None to never expire
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)"
+            )
+            self._purge_expired()
+
+    def _purge_expired(self) -> None:
+        """Delete entries older than the TTL. Callers hold the lock inside a transaction."""
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+
+    @staticmethod
+    def make_key(prompt_name: str, prompt_hash: bytes = b"", **kwargs: Any) -> str:
+        """
+        Build a cache key for a prompt and its inputs.
+
+        Args:
+            prompt_name: Name identifying the prompt or pipeline
+            prompt_hash: Precomputed fingerprint of the prompt text (such as
+                a NAME_PROMPT_HASH), so editing a prompt invalidates its entries
+            **kwargs: Inputs used to render the prompt
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = prompt_name.encode() + prompt_hash + canonical_json(kwargs)
+        return hashlib.blake2b(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key returned by make_key
+
+        Returns:
+            The cached response, or None on a miss or an expired entry
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        response, created_at = row
+        if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+            return None
+
+        return response
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Store a response in the cache, dropping any entries that have expired.
+
+        Args:
+            key: Key returned by make_key
+            response: LLM response to cache
+        """
+        with self._lock, self._conn:
+            self._purge_expired()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )